@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import io
+import json
+import time
+import platform
+import tempfile
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import blihbetter
+from mock_blih import MockBlihServer, MockBlihState
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_ITERATIONS = 20
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def reset_client():
+    if blihbetter.client is not None:
+        blihbetter.client.close()
+    blihbetter.client = None
+    blihbetter.get_cache().read = False
+    blihbetter.get_cache().write = False
+
+def measure(name, action, iterations, operations=1, **params):
+    timings = []
+    errors = 0
+    for i in range(iterations):
+        reset_client()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                action(i)
+        except SystemExit as e:
+            if e.code:
+                errors += 1
+        timings.append(time.perf_counter() - start)
+    total = sum(timings)
+    result = {
+        'name': name,
+        'params': params,
+        'iterations': iterations,
+        'errors': errors,
+        'mean': total / iterations,
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'max': max(timings),
+        'throughput': operations * iterations / total if total else 0
+    }
+    print('{:<16} {:<34} {:>9.2f} {:>9.2f} {:>9.2f} {:>10.1f} {:>6}'.format(name, ' '.join(k + '=' + str(v) for k, v in params.items()), result['p50'] * 1000, result['p95'] * 1000, result['max'] * 1000, result['throughput'], errors), flush=True)
+    return result
+
+def run(sizes, concurrency, iterations, latency, error_rate):
+    results = []
+    print('{:<16} {:<34} {:>9} {:>9} {:>9} {:>10} {:>6}'.format('BENCHMARK', 'PARAMETERS', 'P50 (ms)', 'P95 (ms)', 'MAX (ms)', 'OPS/S', 'ERRORS'))
+    for size in sizes:
+        server = MockBlihServer(state=MockBlihState(repositories=size), latency=latency, error_rate=error_rate).start()
+        user_config = server.user_config()
+        repositories = sorted(server.state.repositories)
+        try:
+            results.append(measure('ls', lambda i: blihbetter.ls(user_config), iterations, size=size))
+            results.append(measure('info', lambda i: blihbetter.info(user_config, repositories[0]), iterations, size=size))
+            results.append(measure('acl get', lambda i: blihbetter.get_acl(user_config, repositories[0]), iterations, size=size))
+            results.append(measure('acl set', lambda i: blihbetter.set_acl(user_config, repositories[i % size], 'benchmark', 'r'), iterations, size=size))
+            results.append(measure('create', lambda i: blihbetter.create(user_config, 'bench-' + str(size) + '-' + str(time.time_ns())), iterations, size=size))
+            for jobs in concurrency:
+                results.append(measure('bulk acl set', lambda i: blihbetter.bulk_set_acl(user_config, '*', 'benchmark', 'r' if i % 2 else '', jobs=jobs), max(1, iterations // 10), operations=size, size=size, jobs=jobs))
+                results.append(measure('ls --long', lambda i: blihbetter.ls_long(user_config, jobs=jobs), max(1, iterations // 10), operations=size, size=size, jobs=jobs))
+        finally:
+            server.stop()
+    return results
+
+def compare(results, path):
+    with open(path, 'r') as file:
+        previous = {(result['name'], json.dumps(result['params'], sort_keys=True)): result for result in json.load(file)['results']}
+    print()
+    print('Compared to', path)
+    for result in results:
+        old = previous.get((result['name'], json.dumps(result['params'], sort_keys=True)))
+        if old and old['p50']:
+            change = (result['p50'] - old['p50']) / old['p50'] * 100
+            print('{:<16} {:<34} {:>+8.1f}%{}'.format(result['name'], ' '.join(k + '=' + str(v) for k, v in result['params'].items()), change, '  \033[31mREGRESSION\033[0m' if change > 10 else ''))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark blihbetter commands against a local mock Blih server.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='account sizes (number of repositories)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY, help='concurrency levels of the bulk commands')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--latency', type=float, default=0.02, help='mean injected server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--output', default='bench/results-' + blihbetter.BLIHBETTER_VERSION + '.json')
+    parser.add_argument('--compare', help='previous results file to compare with')
+    args = parser.parse_args()
+    blihbetter.metadata_cache = blihbetter.BlihCache(os.path.join(tempfile.mkdtemp(), 'cache.json'))
+    results = run(args.sizes, args.concurrency, args.iterations, args.latency, args.error_rate)
+    with open(args.output, 'w') as file:
+        json.dump({
+            'version': blihbetter.BLIHBETTER_VERSION,
+            'python': platform.python_version(),
+            'time': int(time.time()),
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'results': results
+        }, file, indent=2)
+    print()
+    print('Results written to', args.output)
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+import gzip
+import json
+import hmac
+import hashlib
+import random
+import time
+import uuid
+import threading
+import argparse
+import urllib.parse
+import http.server
+
+DEFAULT_USER = 'benchmark@epitech.eu'
+DEFAULT_PASSWORD = 'benchmark'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+COMPRESSION_THRESHOLD = 1024
+
+def make_token(password):
+    return hashlib.sha512(bytes(password, 'utf8')).hexdigest()
+
+def check_signature(token, body):
+    signature = hmac.new(bytes(token, 'utf8'), msg=bytes(body['user'], 'utf8'), digestmod=hashlib.sha512)
+    if body.get('data'):
+        signature.update(bytes(json.dumps(body['data'], sort_keys=True, indent=4, separators=(',', ': ')), 'utf8'))
+    return hmac.compare_digest(signature.hexdigest(), body.get('signature', ''))
+
+class MockBlihState:
+    def __init__(self, user=DEFAULT_USER, token=None, repositories=0, sshkeys=0):
+        self.user = user
+        self.token = token if token else make_token(DEFAULT_PASSWORD)
+        self.lock = threading.Lock()
+        self.repositories = {}
+        self.sshkeys = {}
+        self.requests = 0
+        for i in range(repositories):
+            self.create('repo-' + str(i).zfill(5), description='Repository ' + str(i))
+            if i % 2 == 0:
+                self.repositories['repo-' + str(i).zfill(5)]['acls']['ramassage-tek'] = 'r'
+        for i in range(sshkeys):
+            self.sshkeys['key-' + str(i)] = 'ssh-ed25519 ' + hashlib.sha256(bytes(str(i), 'utf8')).hexdigest() + ' key-' + str(i)
+
+    def create(self, name, description=None):
+        self.repositories[name] = {
+            'uuid': str(uuid.uuid4()),
+            'description': description,
+            'public': 'False',
+            'creation_time': str(int(time.time())),
+            'acls': {}
+        }
+
+class MockBlihHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockBlih/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def reply(self, code, content):
+        body = bytes(json.dumps(content), 'utf8')
+        compressed = self.server.compression and len(body) > COMPRESSION_THRESHOLD and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if compressed:
+            body = gzip.compress(body, 6)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length).decode('utf8')) if length else {}
+        except ValueError:
+            return self.reply(400, {'error': 'Invalid JSON'})
+        state = self.server.state
+        with state.lock:
+            state.requests += 1
+        if self.server.latency:
+            time.sleep(max(0, random.gauss(self.server.latency, self.server.latency / 4)))
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            return self.reply(500, {'error': 'Injected error'})
+        if body.get('user') != state.user or not check_signature(state.token, body):
+            return self.reply(401, {'error': 'Bad token'})
+        path = [urllib.parse.unquote(part) for part in urllib.parse.urlsplit(self.path).path.split('/') if part]
+        with state.lock:
+            return self.route(state, self.command, path, body.get('data') or {})
+
+    def route(self, state, method, path, data):
+        if path == ['whoami'] and method == 'GET':
+            return self.reply(200, {'message': state.user})
+        if path == ['repositories'] and method == 'GET':
+            return self.reply(200, {'message': 'Listing successful', 'repositories': {name: {'uuid': repo['uuid'], 'url': 'https://blih.epitech.eu/repository/' + name} for name, repo in state.repositories.items()}})
+        if path == ['repositories'] and method == 'POST':
+            if not data.get('name'):
+                return self.reply(400, {'error': 'Missing name'})
+            if data['name'] in state.repositories:
+                return self.reply(409, {'error': 'Repository already exists'})
+            state.create(data['name'], description=data.get('description'))
+            return self.reply(200, {'message': 'Repository successfully created'})
+        if len(path) in (2, 3) and path[0] == 'repository':
+            repo = state.repositories.get(path[1])
+            if repo is None:
+                return self.reply(404, {'error': 'No such repository'})
+            if len(path) == 2 and method == 'GET':
+                return self.reply(200, {'message': {'name': path[1], 'uuid': repo['uuid'], 'url': 'https://blih.epitech.eu/repository/' + path[1], 'description': repo['description'], 'public': repo['public'], 'creation_time': repo['creation_time']}})
+            if len(path) == 2 and method == 'DELETE':
+                del state.repositories[path[1]]
+                return self.reply(200, {'message': 'Repository deleted'})
+            if path[2:] == ['acls'] and method == 'GET':
+                if not repo['acls']:
+                    return self.reply(404, {'error': 'No ACLs'})
+                return self.reply(200, dict(repo['acls']))
+            if path[2:] == ['acls'] and method == 'POST':
+                if not data.get('user'):
+                    return self.reply(400, {'error': 'Missing user'})
+                if data.get('acl'):
+                    repo['acls'][data['user']] = data['acl']
+                else:
+                    repo['acls'].pop(data['user'], None)
+                return self.reply(200, {'message': 'ACLs successfully set'})
+        if path == ['sshkeys'] and method == 'GET':
+            return self.reply(200, dict(state.sshkeys))
+        if path == ['sshkeys'] and method == 'POST':
+            key = urllib.parse.unquote(data.get('sshkey', ''))
+            parts = key.split()
+            if len(parts) < 2:
+                return self.reply(400, {'error': 'Invalid ssh key'})
+            state.sshkeys[parts[2] if len(parts) > 2 else parts[1][-16:]] = key
+            return self.reply(200, {'message': 'Public key successfully uploaded'})
+        if len(path) == 2 and path[0] == 'sshkey' and method == 'DELETE':
+            if state.sshkeys.pop(path[1], None) is None:
+                return self.reply(404, {'error': 'No such key'})
+            return self.reply(200, {'message': 'Key successfully deleted'})
+        return self.reply(404, {'error': 'Not found'})
+
+    do_GET = handle_request
+    do_POST = handle_request
+    do_PUT = handle_request
+    do_DELETE = handle_request
+
+class MockBlihServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host=DEFAULT_HOST, port=0, state=None, latency=0, error_rate=0, verbose=False, compression=True):
+        http.server.ThreadingHTTPServer.__init__(self, (host, port), MockBlihHandler)
+        self.state = state if state else MockBlihState()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.compression = compression
+        self.thread = None
+
+    @property
+    def url(self):
+        return 'http://' + self.server_address[0] + ':' + str(self.server_address[1]) + '/'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def user_config(self, user_agent='blih-1.7-win'):
+        return {
+            'user': self.state.user,
+            'token': self.state.token,
+            'git_url': 'git@localhost',
+            'blih_url': self.url,
+            'blih_user_agent': user_agent
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local stand-in for the Blih API.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--user', default=DEFAULT_USER)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--repositories', type=int, default=100, help='number of generated repositories')
+    parser.add_argument('--sshkeys', type=int, default=2, help='number of generated ssh keys')
+    parser.add_argument('--latency', type=float, default=0, help='mean injected latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with a 500')
+    parser.add_argument('--no-compression', action='store_true', help='never gzip the responses')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    server = MockBlihServer(args.host, args.port, MockBlihState(args.user, make_token(args.password), args.repositories, args.sshkeys), args.latency, args.error_rate, args.verbose, not args.no_compression)
+    print('Mock Blih listening on', server.url, 'as', args.user, '(password: ' + args.password + ')')
+    print(json.dumps(server.user_config()))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import py_compile
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blihbetter.py')
+COMPLETION = os.path.join(os.path.dirname(SCRIPT), 'blihbetter_completion.py')
+DEFAULT_COMMANDS = ('help', 'whoami', 'config info')
+DEFAULT_RUNS = 20
+DEFAULT_TARGET = 30
+DEFAULT_NAMES = 5000
+COMPLETION_TARGET = 20
+STUB = '#!/usr/bin/env python3\nimport sys\nsys.path.insert(0, {!r})\nfrom blihbetter import main\nmain(sys.argv)\n'
+NAMES = 'import sys\nsys.path.insert(0, {!r})\nimport blihbetter\nblihbetter.write_names({{"repositories": ["repo-%05d" % i for i in range({})], "users": ["ramassage-tek"], "sshkeys": []}})\nprint(blihbetter.completion_program())\n'
+
+def install(directory):
+    for module in (SCRIPT, COMPLETION):
+        shutil.copy(module, os.path.join(directory, os.path.basename(module)))
+        py_compile.compile(os.path.join(directory, os.path.basename(module)), doraise=True)
+    with open(os.path.join(directory, 'blihbetter'), 'w') as file:
+        file.write(STUB.format(directory))
+    return os.path.join(directory, 'blihbetter')
+
+def run(program, command, runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, program] + command.split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+def baseline(runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'])
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+def completion(directory, names, runs):
+    env = dict(os.environ, HOME=directory)
+    program = subprocess.run([sys.executable, '-c', NAMES.format(directory, names)], env=env, stdout=subprocess.PIPE, check=True).stdout.decode('utf-8')
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-S', '-E', '-c', program, 'info', 'repo-012'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+def imports(program, command):
+    cmd = subprocess.run([sys.executable, '-X', 'importtime', program] + command.split(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    modules = []
+    for line in cmd.stderr.decode('utf-8', 'replace').splitlines():
+        if line.startswith('import time:') and not line.endswith('| imported package'):
+            parts = line[len('import time:'):].split('|')
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                modules.append((int(parts[1]), parts[2].rstrip()))
+    return modules
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure blihbetter startup time for commands that need no network.')
+    parser.add_argument('commands', nargs='*', default=DEFAULT_COMMANDS)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET, help='maximum median wall time in ms')
+    parser.add_argument('--top', type=int, default=5, help='number of slowest top-level imports to show')
+    parser.add_argument('--direct', action='store_true', help='run blihbetter.py itself instead of the layout of install.sh')
+    parser.add_argument('--names', type=int, default=DEFAULT_NAMES, help='repositories in the name store of the completion run (0 to skip it)')
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    program = SCRIPT if args.direct else install(directory)
+    interpreter = baseline(args.runs)
+    print('{:<16} {:>10}'.format('python -c pass', '{:.1f} ms'.format(interpreter)))
+    failed = False
+    for command in args.commands:
+        median = run(program, command, args.runs)
+        failed = failed or median > args.target
+        print('{:<16} {:>10} {:>12} {}'.format(command, '{:.1f} ms'.format(median), '(+{:.1f} ms)'.format(median - interpreter), '\033[31mOVER TARGET\033[0m' if median > args.target else ''))
+        for cumulative, module in sorted([module for module in imports(program, command) if not module[1].startswith('  ')], reverse=True)[:args.top]:
+            print('    {:>8.1f} ms {}'.format(cumulative / 1000, module.strip()))
+    if args.names:
+        median = completion(directory, args.names, args.runs)
+        failed = failed or median > COMPLETION_TARGET
+        print('{:<16} {:>10} {:>12} {}'.format('completion', '{:.1f} ms'.format(median), '(+{:.1f} ms)'.format(median - interpreter), '\033[31mOVER TARGET\033[0m' if median > COMPLETION_TARGET else ''))
+    sys.exit(1 if failed else 0)
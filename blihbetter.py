@@ -2,16 +2,9 @@
 
 import os
 import sys
-import subprocess
-import json
-import hmac
-import hashlib
-import urllib.request
-import urllib.parse
-import getpass
-import datetime
-import curses
-from curses.textpad import Textbox, rectangle
+import time
+import atexit
+import _thread
 
 BLIHBETTER_VERSION = '2.4.0'
 USER_IDENTIFIER = 'user'
@@ -19,10 +12,73 @@ TOKEN_IDENTIFIER = 'token'
 GIT_URL_IDENTIFIER = 'git_url'
 BLIH_URL_IDENTIFIER = 'blih_url'
 USER_AGENT_IDENTIFIER = 'blih_user_agent'
+POOL_SIZE_IDENTIFIER = 'blih_pool_size'
+RATE_LIMIT_IDENTIFIER = 'blih_rate_limit'
+RETRIES_IDENTIFIER = 'blih_retries'
+SSH_PERSIST_IDENTIFIER = 'git_ssh_persist'
+QUEUE_IDENTIFIER = 'blih_offline_queue'
 DEFAULT_CONFIG_FILE = os.path.expanduser("~") + "/.config/epitech/config.json"
+DEFAULT_CACHE_FILE = os.path.expanduser("~") + "/.cache/epitech/blihbetter-cache.json"
+DEFAULT_AUDIT_FILE = os.path.expanduser("~") + "/.cache/epitech/blihbetter-audit.json"
+DEFAULT_SYNC_FILE = os.path.expanduser("~") + "/.cache/epitech/blihbetter-sync.json"
+DEFAULT_QUEUE_FILE = os.path.expanduser("~") + "/.cache/epitech/blihbetter-queue.jsonl"
+DEFAULT_OBJECT_STORE = (os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~") + "/.local/share") + "/epitech/blihbetter-objects.git"
+DEFAULT_NAMES_FILE = os.path.expanduser("~") + "/.cache/epitech/blihbetter-names.marshal"
 DEFAULT_GIT_URL = "git@git.epitech.eu"
 DEFAULT_BLIH_URL = "https://blih.epitech.eu/"
 DEFAULT_USER_AGENT = 'blih-1.7-win'
+DEFAULT_POOL_SIZE = 4
+DEFAULT_RATE_LIMIT = 0
+DEFAULT_RETRIES = 3
+DEFAULT_SSH_PERSIST = 300
+MAX_CONCURRENCY = 32
+RETRY_CODES = (0, 429, 500, 502, 503, 504)
+QUEUE_CODES = (0, 502, 503, 504)
+QUEUE_OPERATIONS = {
+    'create_repository': 'create',
+    'delete_repository': 'rm',
+    'set_acl': 'acl set',
+    'upload_sshkey': 'sshkey upload',
+    'remove_sshkey': 'sshkey rm'
+}
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 10
+SLOW_LATENCY_FACTOR = 4
+SLOW_LATENCY_FLOOR = 0.5
+DEFAULT_TIMEOUT = 30
+STREAM_CHUNK_SIZE = 65536
+STREAM_QUEUE_SIZE = 4096
+STREAM_BUFFERED_CHUNKS = 4
+STREAM_CACHE_MAX_ENTRIES = 5000
+DEFAULT_JOBS = 8
+MAX_CLONE_JOBS = 16
+LS_SORT_KEYS = ('name', 'date', 'public', 'acls')
+TRACE_PHASES = ('dns', 'connect', 'tls', 'send', 'wait', 'read', 'decode')
+TRACE_ENVIRONMENT = 'BLIHBETTER_TRACE'
+AGENT_ENVIRONMENT = 'BLIHBETTER_AGENT'
+AGENT_HEADER = '!cI'
+GUI_BODY_Y = 4
+GUI_ESCAPE_DELAY = 25
+GUI_POLL_DELAY = 20
+GUI_PREFETCH_RADIUS = 2
+GUI_PREFETCH_WORKERS = 2
+GUI_STREAM_DELAY = 0.05
+CACHE_MAX_ENTRIES = 2048
+CACHE_RECENCY_DELAY = 3600
+AUDIT_MAX_AGE = 86400
+AUDIT_RIGHTS = 'rwa'
+SNAPSHOT_FORMAT = 'blihbetter-snapshot'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FIELDS = ('uuid', 'description', 'public', 'creation_time')
+NAMES_MAX_AGE = 300
+NAMES_REFRESH_DELAY = 60
+COMPLETION_SHELLS = ('bash', 'zsh', 'fish')
+CACHE_TTLS = (
+    ('/repositories', 60),
+    ('/repository/*/acls', 60),
+    ('/repository/*', 600),
+    ('/sshkeys', 300)
+)
 
 def print_logo():
     print('\033[1;36m')
@@ -33,6 +89,9 @@ def print_logo():
     print('\033[0m')
 
 def sign_data(user_config, data=None):
+    import hmac
+    import hashlib
+    import json
     signature = hmac.new(bytes(user_config[TOKEN_IDENTIFIER], 'utf8'), msg=bytes(user_config[USER_IDENTIFIER], 'utf8'), digestmod=hashlib.sha512)
     if data:
         signature.update(bytes(json.dumps(data, sort_keys=True, indent=4, separators=(',', ': ')), 'utf8'))
@@ -41,41 +100,1085 @@ def sign_data(user_config, data=None):
         signed_data['data'] = data
     return signed_data
 
-def blih_request(user_config, resource, method='GET', content_type='application/json', data=None, url=None, gui=False):
-    signed_data = sign_data(user_config, data)
-    if url:
-        req = urllib.request.Request(url=url, method=method, data=bytes(json.dumps(signed_data), 'utf8'))
-    else:
-        req = urllib.request.Request(url=user_config[BLIH_URL_IDENTIFIER] + resource, method=method, data=bytes(json.dumps(signed_data), 'utf8'))
-    req.add_header('Content-Type', content_type)
-    req.add_header('User-Agent', user_config[USER_AGENT_IDENTIFIER])
+class BlihScheduler:
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, max_concurrency=MAX_CONCURRENCY):
+        self.rate = rate
+        self.burst = max(1, rate)
+        self.tokens = self.burst
+        self.refilled = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.active = 0
+        self.baseline = None
+        self.decreased = 0
+        self.released = None
+
+    async def acquire(self):
+        import asyncio
+        while self.rate:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                break
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+        while self.active >= int(self.limit):
+            if self.released is None:
+                self.released = asyncio.Event()
+            self.released.clear()
+            await self.released.wait()
+        self.active += 1
+
+    def release(self, latency, overloaded=False):
+        self.active -= 1
+        now = time.monotonic()
+        if not overloaded:
+            self.baseline = latency if self.baseline is None else min(self.baseline, latency)
+        if overloaded or latency > max(SLOW_LATENCY_FLOOR, self.baseline * SLOW_LATENCY_FACTOR):
+            if now - self.decreased > latency:
+                self.limit = max(1.0, self.limit / 2)
+                self.decreased = now
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        if self.released is not None:
+            self.released.set()
+
+def retry_delay(attempt, retry_after=None):
+    import random
+    if retry_after is not None:
+        return min(RETRY_MAX_DELAY, retry_after)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def is_idempotent(method, resource):
+    return method == 'GET' or (method == 'POST' and resource.startswith('/repository/') and resource.endswith('/acls'))
+
+class BlihTracer:
+    def __init__(self, output=None):
+        import threading
+        self.output = output
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.events = []
+
+    def record(self, category, name, start, end, phases=None, args=None):
+        import threading
+        with self.lock:
+            self.events.append({
+                'category': category,
+                'name': name,
+                'thread': threading.get_ident(),
+                'start': start,
+                'end': end,
+                'phases': phases if phases else [],
+                'args': args if args else {}
+            })
+
+    def summary(self):
+        endpoints = {}
+        for event in self.events:
+            endpoints.setdefault(event['name'], []).append(event)
+        if not endpoints:
+            return
+        width = max(len(name) for name in endpoints)
+        print('\n\033[1;33m' + 'TRACE'.ljust(width) + '  COUNT    P50 ms    P95 ms    MAX ms  ' + ''.join(phase.rjust(9) for phase in TRACE_PHASES) + '\033[0m', file=sys.stderr)
+        for name in sorted(endpoints):
+            durations = sorted(event['end'] - event['start'] for event in endpoints[name])
+            phases = {}
+            for event in endpoints[name]:
+                for phase, start, end in event['phases']:
+                    phases[phase] = phases.get(phase, 0) + end - start
+            line = name.ljust(width) + '  ' + str(len(durations)).rjust(5)
+            for value in (durations[int(0.5 * (len(durations) - 1))], durations[int(0.95 * (len(durations) - 1))], durations[-1]):
+                line += '{:10.2f}'.format(value * 1000)
+            line += '  ' + ''.join('{:9.2f}'.format(phases[phase] / len(durations) * 1000) if phase in phases else '        -' for phase in TRACE_PHASES)
+            print(line, file=sys.stderr)
+        print('\033[2m(phase columns are mean ms per call)\033[0m', file=sys.stderr)
+
+    def write(self):
+        import json
+        events = []
+        for event in self.events:
+            events.append({'name': event['name'], 'cat': event['category'], 'ph': 'X', 'pid': os.getpid(), 'tid': event['thread'], 'ts': (event['start'] - self.origin) * 1000000, 'dur': (event['end'] - event['start']) * 1000000, 'args': event['args']})
+            for phase, start, end in event['phases']:
+                events.append({'name': phase, 'cat': event['category'], 'ph': 'X', 'pid': os.getpid(), 'tid': event['thread'], 'ts': (start - self.origin) * 1000000, 'dur': (end - start) * 1000000})
+        try:
+            with open(self.output, 'w') as file:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+            print('\033[37;44m INFO \033[0m Trace written to \'' + self.output + '\'', file=sys.stderr)
+        except OSError as e:
+            print('\033[37;41m ERROR \033[0m Unable to write trace file :', e, file=sys.stderr)
+
+    def finish(self):
+        with self.lock:
+            self.summary()
+            if self.output:
+                self.write()
+
+tracer = None
+
+def enable_trace(output=None):
+    global tracer
+    if tracer is None:
+        tracer = BlihTracer(output)
+        atexit.register(tracer.finish)
+    elif output:
+        tracer.output = output
+    return tracer
+
+def trace_endpoint(resource):
+    parts = resource.strip('/').split('/')
+    if len(parts) > 1 and parts[0] in ('repository', 'sshkey'):
+        parts[1] = '<name>'
+    return '/' + '/'.join(parts)
+
+def run_subprocess(name, args, **kwargs):
+    import subprocess
+    start = time.perf_counter()
     try:
-        f = urllib.request.urlopen(req)
-    except urllib.error.HTTPError as e:
-        data = json.loads(e.read().decode('utf8'))
-        print(gui)
-        print(e.code)
-        if gui and e.code == 404 and data['error'] == 'No ACLs':
-            return (404, 'No ACLs', 'No ACLs', 'No ACLs')
-        if gui:
-            gui_exit()
-        print("\033[37;41m ERROR \033[0m HTTP Error", str(e.code), ":", data['error'])
-        sys.exit(e.code)
-    if f.status == 200:
+        cmd = subprocess.run(args, **kwargs)
+    finally:
+        if tracer:
+            tracer.record('subprocess', name, start, time.perf_counter())
+    return cmd
+
+class BlihCache:
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=CACHE_MAX_ENTRIES):
+        import threading
+        self.path = path
+        self.max_entries = max_entries
+        self.read = True
+        self.write = True
+        self.lock = threading.Lock()
+        self.entries = None
+        self.dirty = False
+        self.mtime = None
+
+    def load(self):
+        import json
+        if self.entries is None:
+            try:
+                with open(self.path, 'r') as file:
+                    self.mtime = os.fstat(file.fileno()).st_mtime_ns
+                    self.entries = json.load(file)
+            except:
+                self.entries = {}
+        return self.entries
+
+    def sync(self):
+        with self.lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if self.entries is not None and not self.dirty and mtime != self.mtime:
+                self.entries = None
+
+    def ttl(self, resource):
+        import fnmatch
+        for pattern, ttl in CACHE_TTLS:
+            if fnmatch.fnmatchcase(resource, pattern):
+                return ttl
+        return 0
+
+    def key(self, user_config, resource):
+        return user_config[USER_IDENTIFIER] + ' ' + user_config[BLIH_URL_IDENTIFIER].rstrip('/') + resource
+
+    def get(self, user_config, resource):
+        ttl = self.ttl(resource)
+        if not self.read or not ttl:
+            return None
+        with self.lock:
+            entry = self.load().get(self.key(user_config, resource))
+            now = time.time()
+            if entry is None or now - entry['time'] > ttl:
+                return None
+            if now - entry['used'] > CACHE_RECENCY_DELAY:
+                self.dirty = True
+            entry['used'] = now
+            return entry['data']
+
+    def put(self, user_config, resource, data):
+        if not self.write or not self.ttl(resource):
+            return
+        with self.lock:
+            entries = self.load()
+            now = time.time()
+            entries[self.key(user_config, resource)] = {'time': now, 'used': now, 'data': data}
+            if len(entries) > self.max_entries:
+                for key in sorted(entries, key=lambda key: entries[key]['used'])[:len(entries) - self.max_entries]:
+                    del entries[key]
+            self.dirty = True
+
+    def invalidate(self, user_config, resources):
+        with self.lock:
+            entries = self.load()
+            for resource in resources:
+                if entries.pop(self.key(user_config, resource), None) is not None:
+                    self.dirty = True
+
+    def save(self):
+        import json
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path + '.tmp', 'w') as file:
+                    json.dump(self.entries, file)
+                os.replace(self.path + '.tmp', self.path)
+                self.mtime = os.stat(self.path).st_mtime_ns
+                self.dirty = False
+            except OSError:
+                pass
+
+metadata_cache = None
+
+def get_cache():
+    global metadata_cache
+    if metadata_cache is None:
+        metadata_cache = BlihCache()
+        atexit.register(metadata_cache.save)
+    return metadata_cache
+
+class BlihStore(BlihCache):
+    def __init__(self, path):
+        BlihCache.__init__(self, path)
+
+    def account(self, user_config):
+        with self.lock:
+            return dict(self.load().get(self.key(user_config, ''), {}))
+
+    def update(self, user_config, repositories):
+        with self.lock:
+            self.load()[self.key(user_config, '')] = repositories
+            self.dirty = True
+
+    def forget(self, user_config, repo):
+        with self.lock:
+            if self.load().get(self.key(user_config, ''), {}).pop(repo, None) is not None:
+                self.dirty = True
+
+audit_store = None
+sync_store = None
+
+def get_audit_store():
+    global audit_store
+    if audit_store is None:
+        audit_store = BlihStore(DEFAULT_AUDIT_FILE)
+        atexit.register(audit_store.save)
+    return audit_store
+
+def get_sync_store():
+    global sync_store
+    if sync_store is None:
+        sync_store = BlihStore(DEFAULT_SYNC_FILE)
+        atexit.register(sync_store.save)
+    return sync_store
+
+class BlihQueue:
+    def __init__(self, path=DEFAULT_QUEUE_FILE):
+        self.path = path
+
+    def lock(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock = open(self.path + '.lock', 'w')
         try:
-            data = json.loads(f.read().decode('utf8'))
-        except:
-            print("\033[37;41m ERROR \033[0m Can't decode data, aborting")
-            if gui:
-                gui_exit()
-            sys.exit(1)
-        return (f.status, f.reason, f.info(), data)
-    print('\033[37;41m ERROR \033[0m Unknown error')
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        return lock
+
+    def signature(self, user_config, entry):
+        import hmac
+        import hashlib
+        import json
+        content = json.dumps({key: value for key, value in entry.items() if key != 'signature'}, sort_keys=True)
+        return hmac.new(bytes(user_config[TOKEN_IDENTIFIER], 'utf8'), msg=bytes(content, 'utf8'), digestmod=hashlib.sha512).hexdigest()
+
+    def read(self):
+        import json
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf8') as file:
+                for line in file:
+                    if line.strip():
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            entry = None
+                        entries.append((line.rstrip('\n'), entry if isinstance(entry, dict) else None))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def owned(self, user_config, entry):
+        return entry is not None and entry.get('user') == user_config[USER_IDENTIFIER] and entry.get('url') == user_config[BLIH_URL_IDENTIFIER]
+
+    def valid(self, user_config, entry):
+        import hmac
+        return entry.get('operation') in QUEUE_OPERATIONS and isinstance(entry.get('args'), list) and hmac.compare_digest(entry.get('signature', ''), self.signature(user_config, entry))
+
+    def pending(self, user_config):
+        return len([entry for line, entry in self.read() if self.owned(user_config, entry) and self.valid(user_config, entry)])
+
+    def append(self, user_config, operation, args):
+        import json
+        entry = {'user': user_config[USER_IDENTIFIER], 'url': user_config[BLIH_URL_IDENTIFIER], 'time': time.time(), 'operation': operation, 'args': list(args)}
+        entry['signature'] = self.signature(user_config, entry)
+        with open(self.path, 'a', encoding='utf8') as file:
+            file.write(json.dumps(entry, sort_keys=True) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def reject(self, lines):
+        with open(self.path + '.rejected', 'a', encoding='utf8') as file:
+            file.write(''.join(line + '\n' for line in lines))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def rewrite(self, lines):
+        with open(self.path + '.tmp', 'w', encoding='utf8') as file:
+            file.write(''.join(line + '\n' for line in lines))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.path + '.tmp', self.path)
+
+offline_queue = None
+queue_writes = False
+
+def get_queue():
+    global offline_queue
+    if offline_queue is None:
+        offline_queue = BlihQueue()
+    return offline_queue
+
+def cache_dependencies(resource):
+    if resource == '/sshkeys' or resource.startswith('/sshkey/'):
+        return ['/sshkeys']
+    if resource == '/repositories':
+        return ['/repositories']
+    if resource.startswith('/repository/') and resource.endswith('/acls'):
+        return [resource]
+    if resource.startswith('/repository/'):
+        return ['/repositories', resource, resource + '/acls']
+    return []
+
+class BlihError(Exception):
+    def __init__(self, code, message, retry_after=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+        self.attempts = 1
+
+    def __str__(self):
+        attempts = ' (after ' + str(self.attempts) + ' attempts)' if self.attempts > 1 else ''
+        if self.code >= 400:
+            return 'HTTP Error ' + str(self.code) + ' : ' + str(self.message) + attempts
+        return str(self.message) + attempts
+
+class GitError(Exception):
+    pass
+
+class Repository:
+    def __init__(self, name, uuid=None, url=None, description=None, public=None, creation_time=None):
+        self.name = name
+        self.uuid = uuid
+        self.url = url
+        self.description = description
+        self.public = public
+        self.creation_time = creation_time
+
+    @classmethod
+    def from_blih(cls, name, data):
+        public = data.get('public')
+        return cls(name, uuid=data.get('uuid') or None, url=data.get('url') or None, description=data.get('description') or None, public=None if public in (None, '') else str(public) == 'True', creation_time=int(data['creation_time']) if data.get('creation_time') else None)
+
+    def __repr__(self):
+        return 'Repository(' + repr(self.name) + ')'
+
+class Acl:
+    def __init__(self, user, rights=''):
+        self.user = user
+        self.rights = rights
+
+    @property
+    def read(self):
+        return 'r' in self.rights
+
+    @property
+    def write(self):
+        return 'w' in self.rights
+
+    @property
+    def admin(self):
+        return 'a' in self.rights
+
+    def __repr__(self):
+        return 'Acl(' + repr(self.user) + ', ' + repr(self.rights) + ')'
+
+class SshKey:
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+
+    def __repr__(self):
+        return 'SshKey(' + repr(self.name) + ')'
+
+class JsonObjectStream:
+    def __init__(self, member):
+        import codecs
+        import json
+        import re
+        self.member = member
+        self.text = codecs.getincrementaldecoder('utf8')()
+        self.decoder = json.JSONDecoder()
+        self.scan = self.decoder.scan_once
+        self.entry = re.compile(r'[ \t\r\n]*,?[ \t\r\n]*"([^"\\]*)"[ \t\r\n]*:[ \t\r\n]*')
+        self.buffer = ''
+        self.state = 'start'
+        self.key = None
+        self.values = {}
+
+    def value(self, position, final):
+        import json
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, position)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError('Invalid JSON at ' + str(position))
+            return None, None
+        if self.incomplete(value, end, final):
+            return None, None
+        return value, end
+
+    def incomplete(self, value, end, final):
+        return not final and isinstance(value, (int, float)) and (end == len(self.buffer) or self.buffer[end] not in ' \t\r\n,}]')
+
+    def entries(self, entries, position, final):
+        # The values of the listing are flat objects, so the last '}' of the buffer usually ends an entry
+        # and everything before it decodes in one call. When it does not (a '}' in a string, the end of
+        # the member), the entries are scanned one by one: each call consumes every complete entry.
+        buffer = self.buffer
+        end = buffer.rfind('}', position)
+        if end >= 0:
+            start = position
+            while buffer[start] in ' \t\r\n,':
+                start += 1
+            try:
+                entries.extend(self.decoder.decode('{' + buffer[start:end + 1] + '}').items())
+                position = end + 1
+            except ValueError:
+                pass
+        while True:
+            match = self.entry.match(buffer, position)
+            if match is None:
+                return position
+            try:
+                value, end = self.scan(buffer, match.end())
+            except (StopIteration, ValueError):
+                return position
+            if self.incomplete(value, end, final):
+                return position
+            entries.append((match.group(1), value))
+            position = end
+
+    def feed(self, data, final=False):
+        self.buffer += self.text.decode(data, final)
+        entries = []
+        position = 0
+        while True:
+            while position < len(self.buffer) and self.buffer[position] in ' \t\r\n':
+                position += 1
+            if position == len(self.buffer) or self.state == 'end':
+                break
+            if self.state == 'entry':
+                end = self.entries(entries, position, final)
+                if end != position:
+                    position = end
+                    continue
+            char = self.buffer[position]
+            if self.state == 'start':
+                if char != '{':
+                    raise ValueError('Expected an object')
+                self.state = 'key'
+                position += 1
+            elif self.state in ('key', 'entry') and char in ',}':
+                if char == '}':
+                    self.state = 'key' if self.state == 'entry' else 'end'
+                position += 1
+            elif self.state in ('key', 'entry'):
+                key, end = self.value(position, final)
+                if end is None:
+                    break
+                if not isinstance(key, str):
+                    raise ValueError('Expected a key')
+                self.key = key
+                self.state += '-colon'
+                position = end
+            elif self.state.endswith('-colon'):
+                if char != ':':
+                    raise ValueError('Expected \':\'')
+                self.state = 'open' if self.state == 'key-colon' and self.key == self.member else self.state[:-len('-colon')] + '-value'
+                position += 1
+            elif self.state == 'open' and char == '{':
+                self.values[self.member] = {}
+                self.state = 'entry'
+                position += 1
+            else:
+                value, end = self.value(position, final)
+                if end is None:
+                    break
+                if self.state == 'entry-value':
+                    entries.append((self.key, value))
+                    self.state = 'entry'
+                else:
+                    self.values[self.key] = value
+                    self.state = 'key'
+                position = end
+        self.buffer = self.buffer[position:]
+        if final and self.state != 'end':
+            raise ValueError('Truncated JSON')
+        return entries
+
+def content_decoder(encoding):
+    import zlib
+    encoding = encoding.strip().lower()
+    if encoding in ('', 'identity'):
+        return None
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    raise ValueError('Unsupported content encoding ' + encoding)
+
+def http_proxy(scheme, host):
+    import urllib.parse
+    proxy = os.environ.get(scheme + '_proxy') or os.environ.get(scheme.upper() + '_PROXY')
+    if not proxy or (scheme == 'http' and 'REQUEST_METHOD' in os.environ and not os.environ.get('http_proxy')):
+        return None
+    for entry in (os.environ.get('no_proxy') or os.environ.get('NO_PROXY') or '').replace(',', ' ').split():
+        entry = entry.lstrip('.').lower()
+        if entry == '*' or host.lower() == entry or host.lower().endswith('.' + entry):
+            return None
+    proxy = urllib.parse.urlsplit(proxy if '://' in proxy else 'http://' + proxy)
+    if proxy.scheme != 'http' or not proxy.hostname:
+        raise ValueError('Unsupported proxy ' + proxy.geturl() + ' (only http:// proxies are supported)')
+    authorization = None
+    if proxy.username is not None:
+        import base64
+        credentials = urllib.parse.unquote(proxy.username) + ':' + urllib.parse.unquote(proxy.password or '')
+        authorization = 'Basic ' + base64.b64encode(bytes(credentials, 'utf8')).decode('ascii')
+    return (proxy.hostname, proxy.port if proxy.port else 80, authorization)
+
+class BlihClient:
+    def __init__(self, user_config, cache=None, scheduler=None, pool_size=None, timeout=DEFAULT_TIMEOUT, on_write=None):
+        self.user_config = user_config
+        self.cache = cache
+        self.on_write = on_write
+        self.scheduler = scheduler if scheduler else BlihScheduler(rate=float(user_config.get(RATE_LIMIT_IDENTIFIER, DEFAULT_RATE_LIMIT)))
+        self.retries = int(user_config.get(RETRIES_IDENTIFIER, DEFAULT_RETRIES))
+        self.pool_size = pool_size if pool_size else int(user_config.get(POOL_SIZE_IDENTIFIER, DEFAULT_POOL_SIZE))
+        self.timeout = timeout
+        self.context = None
+        self.idle = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def whoami(self):
+        return (await self.send('/whoami'))['message']
+
+    async def repositories(self):
+        data = await self.send('/repositories')
+        return [Repository.from_blih(name, data['repositories'][name]) for name in sorted(data['repositories'])]
+
+    async def iter_repositories(self):
+        import asyncio
+        cached = self.cached('/repositories')
+        if cached is not None:
+            for name, data in cached['repositories'].items():
+                yield Repository.from_blih(name, data)
+            return
+        stream = JsonObjectStream('repositories')
+        batches = asyncio.Queue(STREAM_BUFFERED_CHUNKS)
+        async def sink(data, final=False):
+            try:
+                received = stream.feed(data, final)
+            except ValueError:
+                raise BlihError(200, 'Can\'t decode data, aborting')
+            if received:
+                await batches.put(received)
+        async def receive():
+            try:
+                await self.schedule('/repositories', sink=sink)
+                await sink(b'', True)
+                await batches.put(None)
+            except Exception as e:
+                await batches.put(e)
+        listing = {} if self.cache is not None and self.cache.write else None
+        task = asyncio.ensure_future(receive())
+        try:
+            while True:
+                batch = await batches.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                if listing is not None:
+                    listing.update(batch)
+                    if len(listing) > STREAM_CACHE_MAX_ENTRIES:
+                        listing = None
+                for name, data in batch:
+                    yield Repository.from_blih(name, data)
+        finally:
+            task.cancel()
+        if listing is not None:
+            self.cache.put(self.user_config, '/repositories', {'message': stream.values.get('message'), 'repositories': listing})
+
+    async def repository(self, name):
+        return Repository.from_blih(name, (await self.send('/repository/' + name))['message'])
+
+    async def create_repository(self, name, description=None):
+        data = {'name': name, 'type': 'git'}
+        if description:
+            data['description'] = description
+        return (await self.send('/repositories', method='POST', data=data))['message']
+
+    async def delete_repository(self, name):
+        return (await self.send('/repository/' + name, method='DELETE'))['message']
+
+    async def acls(self, name):
+        resource = '/repository/' + name + '/acls'
+        try:
+            data = await self.send(resource)
+        except BlihError as e:
+            if e.code != 404 or e.message != 'No ACLs':
+                raise
+            data = {}
+            if self.cache is not None:
+                self.cache.put(self.user_config, resource, data)
+        return [Acl(user, rights) for user, rights in data.items()]
+
+    async def set_acl(self, name, user, rights=''):
+        return (await self.send('/repository/' + name + '/acls', method='POST', data={'user': user, 'acl': rights}))['message']
+
+    async def sshkeys(self):
+        return [SshKey(name, key) for name, key in (await self.send('/sshkeys')).items()]
+
+    async def upload_sshkey(self, key):
+        import urllib.parse
+        return (await self.send('/sshkeys', method='POST', data={'sshkey': urllib.parse.quote(key.strip('\n'))}))['message']
+
+    async def remove_sshkey(self, name):
+        return (await self.send('/sshkey/' + name, method='DELETE'))['message']
+
+    def cached(self, resource):
+        if self.cache is None:
+            return None
+        start = time.perf_counter()
+        cached = self.cache.get(self.user_config, resource)
+        if cached is not None and tracer:
+            tracer.record('cache', 'GET ' + trace_endpoint(resource) + ' (cache)', start, time.perf_counter())
+        return cached
+
+    async def send(self, resource, method='GET', data=None):
+        if method == 'GET' and self.cache is not None:
+            cached = self.cached(resource)
+            if cached is not None:
+                return cached
+            result = await self.schedule(resource, method=method, data=data)
+            self.cache.put(self.user_config, resource, result)
+            return result
+        try:
+            return await self.schedule(resource, method=method, data=data)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(self.user_config, cache_dependencies(resource))
+            if self.on_write is not None:
+                self.on_write(resource)
+
+    async def schedule(self, resource, method='GET', data=None, sink=None):
+        import asyncio
+        retries = self.retries if is_idempotent(method, resource) else 0
+        attempt = 0
+        received = []
+        async def tracked(data):
+            received.append(len(data))
+            await sink(data)
+        while True:
+            await self.scheduler.acquire()
+            start = time.monotonic()
+            error = None
+            try:
+                return await self.fetch(resource, method=method, data=data, sink=tracked if sink is not None else None)
+            except BlihError as e:
+                error = e
+                e.attempts = attempt + 1
+                if attempt >= retries or e.code not in RETRY_CODES or received:
+                    raise
+            finally:
+                self.scheduler.release(time.monotonic() - start, overloaded=error is not None and error.code in RETRY_CODES)
+            delay = retry_delay(attempt, error.retry_after)
+            start = time.perf_counter()
+            await asyncio.sleep(delay)
+            if tracer:
+                tracer.record('retry', 'retry ' + method + ' ' + trace_endpoint(resource), start, time.perf_counter(), args={'attempt': attempt + 1, 'code': error.code})
+            attempt += 1
+
+    async def fetch(self, resource, method='GET', data=None, sink=None):
+        import asyncio
+        import json
+        import urllib.parse
+        url = urllib.parse.urlsplit(self.user_config[BLIH_URL_IDENTIFIER] + resource)
+        body = bytes(json.dumps(sign_data(self.user_config, data)), 'utf8')
+        path = urllib.parse.quote(url.path if url.path else '/', safe='/%')
+        try:
+            proxy = http_proxy(url.scheme, url.hostname) if url.scheme == 'http' else None
+        except ValueError as e:
+            raise BlihError(0, str(e))
+        head = method + ' ' + (url.scheme + '://' + url.netloc + path if proxy else path) + ' HTTP/1.1\r\n'
+        head += 'Host: ' + url.netloc + '\r\n'
+        if proxy and proxy[2]:
+            head += 'Proxy-Authorization: ' + proxy[2] + '\r\n'
+        head += 'Content-Type: application/json\r\n'
+        head += 'User-Agent: ' + self.user_config[USER_AGENT_IDENTIFIER] + '\r\n'
+        head += 'Accept-Encoding: gzip, deflate\r\n'
+        head += 'Connection: keep-alive\r\n'
+        head += 'Content-Length: ' + str(len(body)) + '\r\n\r\n'
+        phases = []
+        status = 0
+        start = time.perf_counter()
+        try:
+            try:
+                status, reason, headers, content = await self.exchange(url, head.encode('latin-1') + body, phases, sink)
+            except (OSError, ValueError, EOFError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                raise BlihError(0, 'Unable to reach ' + self.user_config[BLIH_URL_IDENTIFIER] + ' : ' + (str(e) if str(e) else type(e).__name__))
+            if status >= 400:
+                try:
+                    error = json.loads(content.decode('utf8'))['error']
+                except:
+                    error = reason
+                try:
+                    retry_after = float(headers.get('retry-after'))
+                except (TypeError, ValueError):
+                    retry_after = None
+                raise BlihError(status, error, retry_after)
+            if status != 200:
+                raise BlihError(status, 'Unknown error')
+            if sink is not None:
+                return None
+            decode_start = time.perf_counter()
+            try:
+                result = json.loads(content.decode('utf8'))
+            except:
+                raise BlihError(status, 'Can\'t decode data, aborting')
+            phases.append(('decode', decode_start, time.perf_counter()))
+            return result
+        finally:
+            if tracer:
+                tracer.record('http', method + ' ' + trace_endpoint(resource), start, time.perf_counter(), phases, {'status': status})
+
+    async def exchange(self, url, request, phases, sink=None):
+        import asyncio
+        import zlib
+        key = (url.scheme, url.hostname, url.port if url.port else (443 if url.scheme == 'https' else 80))
+        while True:
+            reused = bool(self.idle.get(key))
+            reader, writer = self.idle[key].pop() if reused else await self.timed(self.connect(key, phases))
+            delivered = False
+            try:
+                start = time.perf_counter()
+                writer.write(request)
+                await self.timed(writer.drain())
+                phases.append(('send', start, time.perf_counter()))
+                start = time.perf_counter()
+                line = await self.timed(reader.readline())
+                if not line:
+                    raise ConnectionResetError('Connection closed by the server')
+                phases.append(('wait', start, time.perf_counter()))
+                start = time.perf_counter()
+                version, status, reason = (line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+                headers = {}
+                while True:
+                    line = await self.timed(reader.readline())
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, separator, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                if headers.get('transfer-encoding', '').lower() != 'chunked' and 'content-length' not in headers:
+                    keep_alive = False
+                decoder = content_decoder(headers.get('content-encoding', ''))
+                target = sink if status == '200' else None
+                content = []
+                async for chunk in self.body(reader, headers):
+                    if decoder is not None:
+                        try:
+                            chunk = decoder.decompress(chunk)
+                        except zlib.error as e:
+                            raise ValueError('Invalid compressed body : ' + str(e))
+                    if target is None:
+                        content.append(chunk)
+                    elif chunk:
+                        delivered = True
+                        await target(chunk)
+                if decoder is not None and not decoder.eof:
+                    raise EOFError('Truncated compressed body')
+                content = b''.join(content)
+                phases.append(('read', start, time.perf_counter()))
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and not delivered:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive and len(self.idle.setdefault(key, [])) < self.pool_size:
+                self.idle[key].append((reader, writer))
+            else:
+                writer.close()
+            return (int(status), reason, headers, content)
+
+    def timed(self, awaitable):
+        import asyncio
+        return asyncio.wait_for(awaitable, self.timeout)
+
+    async def body(self, reader, headers):
+        import asyncio
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.timed(reader.readline())).split(b';')[0], 16)
+                if size == 0:
+                    while (await self.timed(reader.readline())) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                yield await self.timed(reader.readexactly(size))
+                await self.timed(reader.readexactly(2))
+        elif 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining:
+                chunk = await self.timed(reader.read(min(remaining, STREAM_CHUNK_SIZE)))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await self.timed(reader.read(STREAM_CHUNK_SIZE))
+                if not chunk:
+                    return
+                yield chunk
+
+    async def connect(self, key, phases):
+        import asyncio
+        import socket
+        loop = asyncio.get_running_loop()
+        scheme, host, port = key
+        proxy = http_proxy(scheme, host)
+        start = time.perf_counter()
+        addresses = await loop.getaddrinfo(proxy[0] if proxy else host, proxy[1] if proxy else port, type=socket.SOCK_STREAM)
+        phases.append(('dns', start, time.perf_counter()))
+        start = time.perf_counter()
+        for i, (family, type, proto, canonname, address) in enumerate(addresses):
+            sock = socket.socket(family, type, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                break
+            except OSError:
+                sock.close()
+                if i == len(addresses) - 1:
+                    raise
+            except BaseException:
+                sock.close()
+                raise
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if proxy and scheme == 'https':
+            try:
+                await self.tunnel(sock, host, port, proxy[2])
+            except BaseException:
+                sock.close()
+                raise
+        phases.append(('connect', start, time.perf_counter()))
+        if scheme != 'https':
+            return await asyncio.open_connection(sock=sock)
+        import ssl
+        if self.context is None:
+            self.context = ssl.create_default_context()
+        start = time.perf_counter()
+        connection = await asyncio.open_connection(sock=sock, ssl=self.context, server_hostname=host)
+        phases.append(('tls', start, time.perf_counter()))
+        return connection
+
+    async def tunnel(self, sock, host, port, authorization):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        request = 'CONNECT ' + host + ':' + str(port) + ' HTTP/1.1\r\nHost: ' + host + ':' + str(port) + '\r\n'
+        if authorization:
+            request += 'Proxy-Authorization: ' + authorization + '\r\n'
+        await loop.sock_sendall(sock, (request + '\r\n').encode('latin-1'))
+        response = b''
+        while b'\r\n\r\n' not in response:
+            chunk = await loop.sock_recv(sock, 4096)
+            if not chunk:
+                raise ConnectionResetError('Connection closed by the proxy')
+            response += chunk
+        status = response.split(b'\r\n', 1)[0].decode('latin-1')
+        if status.split(' ')[1:2] != ['200']:
+            raise OSError('Proxy refused to connect to ' + host + ' : ' + status)
+
+    async def close(self):
+        for connections in self.idle.values():
+            for reader, writer in connections:
+                writer.close()
+        self.idle = {}
+
+class SyncBlihClient:
+    def __init__(self, user_config, **kwargs):
+        import threading
+        self.client = BlihClient(user_config, **kwargs)
+        self.lock = threading.Lock()
+        self.loop = None
+
+    def submit(self, coroutine):
+        import asyncio
+        import threading
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        return self.submit(coroutine).result()
+
+    def close(self):
+        if self.loop is not None:
+            self.run(self.client.close())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop = None
+
+    def iterate(self, generator):
+        import asyncio
+        import collections
+        import threading
+        items = collections.deque()
+        ready = threading.Condition()
+        drained = []
+        done = []
+        async def produce():
+            drained.append(asyncio.Event())
+            error = None
+            try:
+                async for item in generator:
+                    with ready:
+                        items.append(item)
+                        ready.notify()
+                        full = len(items) >= STREAM_QUEUE_SIZE
+                    if full:
+                        drained[0].clear()
+                        await drained[0].wait()
+            except Exception as e:
+                error = e
+            with ready:
+                done.append(error)
+                ready.notify()
+        future = self.submit(produce())
+        try:
+            while True:
+                with ready:
+                    while not items and not done:
+                        ready.wait()
+                    batch = list(items)
+                    items.clear()
+                if not batch:
+                    if done[0] is not None:
+                        raise done[0]
+                    return
+                self.loop.call_soon_threadsafe(drained[0].set)
+                yield from batch
+        finally:
+            future.cancel()
+
+    def __getattr__(self, name):
+        import asyncio
+        import inspect
+        attribute = getattr(self.client, name)
+        if inspect.isasyncgenfunction(attribute):
+            return lambda *args, **kwargs: self.iterate(attribute(*args, **kwargs))
+        if not asyncio.iscoroutinefunction(attribute):
+            return attribute
+        return lambda *args, **kwargs: self.run(attribute(*args, **kwargs))
+
+client = None
+client_lock = _thread.allocate_lock()
+
+def get_client(user_config):
+    global client
+    with client_lock:
+        if client is None or client.user_config != user_config:
+            if client is not None:
+                client.close()
+            client = SyncBlihClient(user_config, cache=get_cache(), on_write=lambda resource: forget_written(user_config, resource))
+        return client
+
+def forget_written(user_config, resource):
+    invalidate_names()
+    if resource.startswith('/repository/'):
+        get_audit_store().forget(user_config, resource.split('/')[2])
+
+def blih_exit(error, gui=False):
     if gui:
         gui_exit()
-    sys.exit(1)
+    print('\033[37;41m ERROR \033[0m', error)
+    sys.exit(error.code if error.code >= 400 else 1)
+
+def blih_request(call, *args, gui=False):
+    try:
+        return call(*args)
+    except BlihError as e:
+        blih_exit(e, gui)
+
+def describe_operation(operation, args):
+    if operation == 'upload_sshkey':
+        return QUEUE_OPERATIONS[operation] + ' ' + (ssh_key_fingerprint(args[0]) or 'invalid key')
+    return ' '.join([QUEUE_OPERATIONS[operation]] + [arg if arg else '-' for arg in args if arg is not None])
+
+def blih_write(user_config, operation, *args):
+    queue = get_queue() if queue_writes or user_config.get(QUEUE_IDENTIFIER) else None
+    if queue is not None:
+        with queue.lock():
+            pending = queue.pending(user_config)
+            if pending:
+                queue.append(user_config, operation, args)
+        if pending:
+            return 'Queued behind ' + str(pending) + ' pending operations: ' + describe_operation(operation, args) + ' (run \'blihbetter flush\')'
+    try:
+        return getattr(get_client(user_config), operation)(*args)
+    except BlihError as e:
+        if queue is None or e.code not in QUEUE_CODES:
+            blih_exit(e)
+        with queue.lock():
+            queue.append(user_config, operation, args)
+        return str(e) + ', queued: ' + describe_operation(operation, args) + ' (run \'blihbetter flush\')'
+
+def blih_stream(call, *args, gui=False):
+    try:
+        yield from call(*args)
+    except BlihError as e:
+        blih_exit(e, gui)
 
 def set_user_config(path=DEFAULT_CONFIG_FILE):
+    import hashlib
+    import getpass
+    import json
     print_logo()
     print('\033[1;33mConfig file generation:\033[0;2m \'' + path + '\'\033[0m', end='\n\n')
     user_config = {}
@@ -108,11 +1211,23 @@ def set_user_config(path=DEFAULT_CONFIG_FILE):
         print("\033[37;41m ERROR \033[0m Unable to create config file")
         exit(1)
 
+user_configs = {}
+
 def get_user_config(path=DEFAULT_CONFIG_FILE):
     try:
+        stat = os.stat(path)
+        key, user_config = user_configs[path]
+        if key == (stat.st_mtime_ns, stat.st_size):
+            return user_config
+    except (OSError, KeyError):
+        pass
+    import json
+    try:
+        stat = os.stat(path)
         with open(path, 'r') as file:
             user_config = json.load(file)
             if user_config[USER_IDENTIFIER] and user_config[TOKEN_IDENTIFIER] and user_config[GIT_URL_IDENTIFIER] and user_config[BLIH_URL_IDENTIFIER] and user_config[USER_AGENT_IDENTIFIER]:
+                user_configs[path] = ((stat.st_mtime_ns, stat.st_size), user_config)
                 return user_config
     except:
         pass
@@ -129,10 +1244,24 @@ def user_config_info(user_config):
     print('Blih URL:        ', user_config[BLIH_URL_IDENTIFIER])
     if (user_config[USER_AGENT_IDENTIFIER]):
         print('Blih user agent: ', user_config[USER_AGENT_IDENTIFIER])
+    if POOL_SIZE_IDENTIFIER in user_config:
+        print('Blih pool size:  ', user_config[POOL_SIZE_IDENTIFIER])
+    if RATE_LIMIT_IDENTIFIER in user_config:
+        print('Blih rate limit: ', user_config[RATE_LIMIT_IDENTIFIER], 'requests/s')
+    if RETRIES_IDENTIFIER in user_config:
+        print('Blih retries:    ', user_config[RETRIES_IDENTIFIER])
+    if SSH_PERSIST_IDENTIFIER in user_config:
+        print('Git ssh persist: ', user_config[SSH_PERSIST_IDENTIFIER], 's')
+    if QUEUE_IDENTIFIER in user_config:
+        print('Offline queue:   ', 'Yes' if user_config[QUEUE_IDENTIFIER] else 'No')
     print()
 
 def get_acl(user_config, repo):
-    status, reason, headers, data = blih_request(user_config, '/repository/' + repo + '/acls', method='GET')
+    acls = blih_request(get_client(user_config).acls, repo)
+    if not acls:
+        print('\033[37;44m INFO \033[0m No ACLs')
+        return
+    data = {acl.user: acl.rights for acl in acls}
     max_user_size = 0
     max_acl_size = 0
     for i in data.keys():
@@ -148,62 +1277,608 @@ def get_acl(user_config, repo):
         print((' ' * int((max_user_part - len(i)) / 2)) + i + (' ' * int((max_user_part - len(i)) / 2 - (len(i) % 2 == 0))) + ' \033[1;33m|\033[0m' + (' ' * int((max_acl_part - len(data[i])) / 2)) + data[i])
 
 def set_acl(user_config, repo, user, acls=''):
-    data = {
-        'user' : user,
-        'acl' : acls
-    }
-    status, reason, headers, data = blih_request(user_config, '/repository/' + repo + '/acls', method='POST', data=data)
-    print('\033[37;44m INFO \033[0m', data['message'])
+    print('\033[37;44m INFO \033[0m', blih_write(user_config, 'set_acl', repo, user, acls))
+
+def is_pattern(name):
+    return any(c in name for c in '*?[')
+
+def expand_repositories(user_config, pattern, from_file=False):
+    import fnmatch
+    if from_file or os.path.isfile(pattern) or not is_pattern(pattern):
+        try:
+            with open(pattern, 'r') as file:
+                patterns = [line.strip() for line in file if line.strip() and not line.startswith('#')]
+        except OSError:
+            print('\033[37;41m ERROR \033[0m Can\'t open file : ' + pattern)
+            sys.exit(1)
+    else:
+        patterns = [pattern]
+    listing = None
+    repositories = []
+    for i in patterns:
+        if is_pattern(i):
+            if listing is None:
+                listing = [repository.name for repository in blih_request(get_client(user_config).repositories)]
+            matches = fnmatch.filter(listing, i)
+        else:
+            matches = [i]
+        for repo in matches:
+            if repo not in repositories:
+                repositories.append(repo)
+    return repositories
+
+def run_bulk(items, action, jobs=None):
+    import threading
+    import shutil
+    import concurrent.futures
+    failures = []
+    running = []
+    done = [0]
+    lock = threading.Lock()
+    progress = sys.stdout.isatty()
+    def print_progress():
+        line = '[' + str(done[0]) + '/' + str(len(items)) + '] ' + ', '.join(running)
+        print('\r\033[K\033[2m' + line[:shutil.get_terminal_size().columns - 1] + '\033[0m', end='', flush=True)
+    def run(item):
+        with lock:
+            running.append(item)
+            if progress:
+                print_progress()
+        try:
+            return action(item)
+        finally:
+            with lock:
+                running.remove(item)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or DEFAULT_JOBS)) as executor:
+        futures = {executor.submit(run, item): item for item in items}
+        for future in concurrent.futures.as_completed(futures):
+            with lock:
+                done[0] += 1
+                if progress:
+                    print('\r\033[K', end='')
+                try:
+                    message = future.result()
+                    print('\033[37;42m OK \033[0m\033[1m', futures[future], '\033[0m', message)
+                except (BlihError, GitError) as e:
+                    failures.append(futures[future])
+                    print('\033[37;41m ERROR \033[0m\033[1m', futures[future], '\033[0m', e)
+                if progress and running:
+                    print_progress()
+    print()
+    print('\033[37;44m INFO \033[0m', len(items) - len(failures), 'succeeded,', len(failures), 'failed')
+    if failures:
+        print('\033[37;41m ERROR \033[0m Failed:', ', '.join(sorted(failures)))
+    return failures
+
+def bulk_get_acl(user_config, pattern, jobs=None):
+    client = get_client(user_config)
+    def action(repo):
+        acls = client.acls(repo)
+        if not acls:
+            return 'no ACLs'
+        return ', '.join(acl.user + ':' + acl.rights for acl in sorted(acls, key=lambda acl: acl.user))
+    repositories = expand_repositories(user_config, pattern)
+    if run_bulk(repositories, action, jobs):
+        sys.exit(1)
+
+def bulk_set_acl(user_config, pattern, user, acls='', jobs=None):
+    client = get_client(user_config)
+    def action(repo):
+        return client.set_acl(repo, user, acls)
+    repositories = expand_repositories(user_config, pattern)
+    if run_bulk(repositories, action, jobs):
+        sys.exit(1)
+
+def parse_audit_rule(rule):
+    if '=' in rule:
+        rights, users = rule.split('=', 1)
+        parsed = ('only', [user for user in users.split(',') if user], rights)
+    elif rule.startswith('!') and ':' in rule:
+        user, rights = rule[1:].rsplit(':', 1)
+        parsed = ('forbid', user, rights)
+    elif ':' in rule:
+        user, rights = rule.rsplit(':', 1)
+        parsed = ('require', user, rights)
+    else:
+        parsed = None
+    if parsed is None or not parsed[1] or not parsed[2] or any(c not in AUDIT_RIGHTS for c in parsed[2]):
+        print('\033[37;41m ERROR \033[0m Invalid audit rule \'' + rule + '\' (<user>:<acl>, !<user>:<acl> or <acl>=<user>,...)')
+        sys.exit(1)
+    return parsed
+
+def audit_acls(rules, acls):
+    import fnmatch
+    violations = []
+    for rule, (kind, users, rights) in rules:
+        if kind == 'require':
+            if not set(rights) <= set(acls.get(users, '')):
+                violations.append((rule, users, acls.get(users, '')))
+        elif kind == 'forbid':
+            for user in sorted(acls):
+                if fnmatch.fnmatchcase(user, users) and set(rights) & set(acls[user]):
+                    violations.append((rule, user, acls[user]))
+        else:
+            for user in sorted(acls):
+                if set(rights) & set(acls[user]) and not any(fnmatch.fnmatchcase(user, allowed) for allowed in users):
+                    violations.append((rule, user, acls[user]))
+    return violations
+
+def audit_scan(user_config, pattern=None, full=False, jobs=None):
+    import asyncio
+    client = get_client(user_config)
+    repositories = blih_request(client.repositories)
+    selected = set(expand_repositories(user_config, pattern)) if pattern else None
+    store = get_audit_store()
+    previous = store.account(user_config)
+    now = time.time()
+    scanned = {repo.name: previous[repo.name] for repo in repositories if repo.name in previous and not full and previous[repo.name]['uuid'] == repo.uuid and now - previous[repo.name]['time'] <= AUDIT_MAX_AGE}
+    stale = [repo for repo in repositories if repo.name not in scanned and (selected is None or repo.name in selected)]
+    progress = sys.stdout.isatty() and len(stale) > 0
+    done = [0]
+    async def fetch(semaphore, repo):
+        async with semaphore:
+            try:
+                acls = await client.client.acls(repo.name)
+                return (repo, {acl.user: acl.rights for acl in acls}, None)
+            except BlihError as e:
+                return (repo, None, e)
+            finally:
+                done[0] += 1
+                if progress:
+                    print('\r\033[K\033[2m[' + str(done[0]) + '/' + str(len(stale)) + '] ' + repo.name + '\033[0m', end='', flush=True)
+    async def fetch_all():
+        semaphore = asyncio.Semaphore(max(1, jobs or DEFAULT_JOBS))
+        return await asyncio.gather(*(fetch(semaphore, repo) for repo in stale))
+    errors = []
+    for repo, acls, error in client.run(fetch_all()):
+        if error:
+            errors.append((repo.name, error))
+        else:
+            scanned[repo.name] = {'uuid': repo.uuid, 'time': now, 'acls': acls}
+    if progress:
+        print('\r\033[K', end='')
+    store.update(user_config, scanned)
+    return ({name: scanned[name]['acls'] for name in sorted(scanned) if selected is None or name in selected}, len(stale) - len(errors), errors)
+
+def acl_audit(user_config, rules, pattern=None, full=False, as_json=False, jobs=None):
+    import json
+    rules = [(rule, parse_audit_rule(rule)) for rule in rules]
+    repositories, fetched, errors = audit_scan(user_config, pattern, full=full, jobs=jobs)
+    violations = [(repo,) + violation for repo in repositories for violation in audit_acls(rules, repositories[repo])]
+    if as_json:
+        print(json.dumps({
+            'repositories': len(repositories),
+            'fetched': fetched,
+            'violations': [{'repository': repo, 'rule': rule, 'user': user, 'acls': acls} for repo, rule, user, acls in violations],
+            'errors': [{'repository': repo, 'code': error.code, 'error': str(error)} for repo, error in errors]
+        }, indent=2))
+    else:
+        if violations:
+            repo_width = max([len('REPOSITORY')] + [len(violation[0]) for violation in violations])
+            rule_width = max([len('RULE')] + [len(violation[1]) for violation in violations])
+            user_width = max([len('USER')] + [len(violation[2]) for violation in violations])
+            print('\033[1;33m' + 'REPOSITORY'.ljust(repo_width) + '  ' + 'RULE'.ljust(rule_width) + '  ' + 'USER'.ljust(user_width) + '  ACLS\033[0m')
+            for repo, rule, user, acls in violations:
+                print(repo.ljust(repo_width) + '  ' + rule.ljust(rule_width) + '  ' + user.ljust(user_width) + '  ' + (acls if acls else '-'))
+            print()
+        for repo, error in errors:
+            print('\033[37;41m ERROR \033[0m\033[1m', repo, '\033[0m', error)
+        print('\033[37;44m INFO \033[0m', len(repositories), 'repositories audited (' + str(fetched), 'fetched),', len(violations), 'violations,', len(set(violation[0] for violation in violations)), 'repositories affected')
+    return violations or errors
 
 def ls(user_config, opt=None):
-    status, reason, headers, data = blih_request(user_config, '/repositories', method='GET')
-    for repository in data['repositories']:
-        print(repository)
+    for repository in blih_stream(get_client(user_config).iter_repositories):
+        print(repository.name)
+
+def ls_long(user_config, sort=None, jobs=None):
+    import datetime
+    import concurrent.futures
+    client = get_client(user_config)
+    repositories = [repository.name for repository in blih_request(client.repositories)]
+    name_width = max([len('NAME')] + [len(repo) for repo in repositories])
+    def fetch(repo):
+        return (client.repository(repo), client.acls(repo))
+    def row(repo, repo_data, acls, error=None):
+        if error:
+            return repo.ljust(name_width) + '  \033[31m' + str(error) + '\033[0m'
+        creation_date = datetime.datetime.fromtimestamp(repo_data.creation_time).strftime('%Y-%m-%d %H:%M') if repo_data.creation_time else '???'
+        return (repo.ljust(name_width) + '  ' + str(repo_data.public if repo_data.public is not None else '???').ljust(6) + '  ' + creation_date.ljust(16) + '  ' + ', '.join(acl.user + ':' + acl.rights for acl in sorted(acls, key=lambda acl: acl.user)).ljust(24) + '  ' + (repo_data.description if repo_data.description else '')).rstrip()
+    def sort_value(result):
+        repo, repo_data, acls, error = result
+        if sort.lstrip('-') == 'date':
+            return repo_data.creation_time if repo_data and repo_data.creation_time else 0
+        if sort.lstrip('-') == 'public':
+            return str(repo_data.public) if repo_data else ''
+        if sort.lstrip('-') == 'acls':
+            return len(acls) if acls else 0
+        return repo
+    if sort and sort.lstrip('-') not in LS_SORT_KEYS:
+        print('\033[37;41m ERROR \033[0m Invalid sort key', sort, '(' + '/'.join(LS_SORT_KEYS) + ')')
+        sys.exit(1)
+    print('\033[1;33m' + 'NAME'.ljust(name_width) + '  ' + 'PUBLIC'.ljust(6) + '  ' + 'CREATED'.ljust(16) + '  ' + 'ACLS'.ljust(24) + '  DESCRIPTION\033[0m')
+    results = []
+    failures = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or DEFAULT_JOBS)) as executor:
+        futures = {executor.submit(fetch, repo): repo for repo in repositories}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = (futures[future],) + future.result() + (None,)
+            except BlihError as e:
+                failures += 1
+                result = (futures[future], None, None, e)
+            if sort:
+                results.append(result)
+            else:
+                print(row(*result), flush=True)
+    for result in sorted(results, key=sort_value, reverse=sort is not None and sort.startswith('-')):
+        print(row(*result))
+    return failures
+
+def read_manifest(path):
+    import json
+    try:
+        with open(path, 'r') as file:
+            manifest = json.load(file)
+        repositories = manifest['repositories']
+        for repo, config in repositories.items():
+            if config is None:
+                repositories[repo] = {}
+            elif not isinstance(config, dict) or not isinstance(config.get('acls', {}), dict):
+                raise ValueError(repo)
+        return manifest
+    except:
+        print('\033[37;41m ERROR \033[0m Invalid manifest file \'' + path + '\'')
+        sys.exit(1)
+
+def plan_manifest(user_config, manifest, prune=False, jobs=None):
+    import concurrent.futures
+    client = get_client(user_config)
+    existing = set(repository.name for repository in blih_request(client.repositories))
+    wanted = manifest['repositories']
+    def fetch_acls(repo):
+        return {acl.user: acl.rights for acl in client.acls(repo)}
+    managed = [repo for repo in sorted(wanted) if repo in existing and 'acls' in wanted[repo]]
+    current_acls = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or DEFAULT_JOBS)) as executor:
+        try:
+            for repo, acls in zip(managed, executor.map(fetch_acls, managed)):
+                current_acls[repo] = acls
+        except BlihError as e:
+            print('\033[37;41m ERROR \033[0m', e)
+            sys.exit(e.code if e.code >= 400 else 1)
+    plan = []
+    for repo in sorted(wanted):
+        if repo not in existing:
+            plan.append(('create', repo, wanted[repo].get('description')))
+        acls = current_acls.get(repo, {})
+        for user, acl in sorted(wanted[repo].get('acls', {}).items()):
+            if set(acls.get(user, '')) != set(acl):
+                plan.append(('acl', repo, user, acls.get(user, ''), acl))
+        if 'acls' in wanted[repo]:
+            for user in sorted(acls):
+                if user not in wanted[repo]['acls'] and acls[user]:
+                    plan.append(('acl', repo, user, acls[user], ''))
+    if prune:
+        for repo in sorted(existing - set(wanted)):
+            plan.append(('delete', repo))
+    elif manifest.get('prune'):
+        print('\033[37;44m INFO \033[0m The manifest asks to delete the repositories missing from it, pass --prune to do it', end='\n\n')
+    return plan
+
+def plan_label(step):
+    if step[0] == 'acl':
+        return step[1] + ' ' + step[2]
+    return step[1]
 
-def clone(user_config, repo):
+def print_plan(plan):
+    for step in plan:
+        if step[0] == 'create':
+            print('\033[32m+ create\033[0m', step[1], ('(' + step[2] + ')') if step[2] else '')
+        elif step[0] == 'acl':
+            print('\033[33m~ acl   \033[0m', step[1], step[2] + ':', (step[3] if step[3] else '-'), '->', (step[4] if step[4] else '-'))
+        else:
+            print('\033[31m- delete\033[0m', step[1])
+    print()
+    print('\033[37;44m INFO \033[0m', len([step for step in plan if step[0] == 'create']), 'to create,', len([step for step in plan if step[0] == 'acl']), 'ACLs to change,', len([step for step in plan if step[0] == 'delete']), 'to delete')
+
+def apply_manifest(user_config, path, plan_only=False, prune=False, jobs=None):
+    plan = plan_manifest(user_config, read_manifest(path), prune=prune, jobs=jobs)
+    print_plan(plan)
+    if plan_only or not plan:
+        return []
+    print()
+    steps = {}
+    for step in plan:
+        steps.setdefault(step[0], {})[plan_label(step)] = step
+    client = get_client(user_config)
+    def create_action(label):
+        step = steps['create'][label]
+        return client.create_repository(step[1], step[2])
+    def acl_action(label):
+        step = steps['acl'][label]
+        return client.set_acl(step[1], step[2], step[4])
+    def delete_action(label):
+        return client.delete_repository(steps['delete'][label][1])
+    failures = run_bulk(list(steps.get('create', {})), create_action, jobs=jobs) if 'create' in steps else []
+    if 'acl' in steps:
+        failures += run_bulk([label for label, step in steps['acl'].items() if step[1] not in failures], acl_action, jobs=jobs)
+    if 'delete' in steps:
+        failures += run_bulk(list(steps['delete']), delete_action, jobs=jobs)
+    return failures
+
+def clone(user_config, repo, shared=False):
     print('Cloning from \'' + user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '\'')
-    return os.system('git clone ' + user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '/' + repo)
+    env = git_environment(user_config)
+    reference = []
+    if shared:
+        try:
+            reference = ['--reference-if-able', shared_object_store(user_config, repo, env)]
+        except GitError as e:
+            print('\033[37;41m ERROR \033[0m', e)
+            return 1
+    return run_subprocess('git clone', ['git', 'clone'] + reference + [git_repository_url(user_config, repo)], env=env).returncode
+
+def object_store():
+    import subprocess
+    if not os.path.isdir(DEFAULT_OBJECT_STORE):
+        cmd = run_subprocess('git init', ['git', 'init', '--quiet', '--bare', DEFAULT_OBJECT_STORE], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if cmd.returncode != 0:
+            raise GitError(git_error(cmd))
+    return DEFAULT_OBJECT_STORE
+
+def shared_object_store(user_config, repo, env=None):
+    import subprocess
+    refspec = '+refs/heads/*:refs/remotes/' + user_config[USER_IDENTIFIER] + '/' + repo + '/*'
+    cmd = run_subprocess('git fetch', ['git', '--git-dir', object_store(), '-c', 'gc.auto=0', 'fetch', '--quiet', '--no-tags', '--no-write-fetch-head', git_repository_url(user_config, repo), refspec], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    if cmd.returncode != 0:
+        raise GitError(git_error(cmd))
+    return DEFAULT_OBJECT_STORE
+
+git_ssh_commands = {}
+
+def private_directory(directory):
+    import stat
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise OSError('\'' + directory + '\' is not a directory only accessible by you')
+    return directory
+
+def ssh_control_path():
+    try:
+        directory = private_directory(os.environ.get('XDG_RUNTIME_DIR') or os.path.join('/tmp', 'blihbetter-' + str(os.getuid())))
+    except OSError:
+        return None
+    return os.path.join(directory, 'blihbetter-ssh-%C')
+
+def git_ssh_options(user_config):
+    import subprocess
+    host = user_config[GIT_URL_IDENTIFIER]
+    persist = int(user_config.get(SSH_PERSIST_IDENTIFIER, DEFAULT_SSH_PERSIST))
+    if os.name != 'posix' or not persist or '://' in host or '/' in host or os.environ.get('GIT_SSH') or os.environ.get('GIT_SSH_COMMAND'):
+        return None
+    if host not in git_ssh_commands:
+        control_path = ssh_control_path()
+        if control_path is None:
+            return None
+        options = ['-o', 'ControlMaster=auto', '-o', 'ControlPath=' + control_path, '-o', 'ControlPersist=' + str(persist)]
+        check = run_subprocess('ssh check', ['ssh', '-O', 'check'] + options + [host], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if check.returncode != 0:
+            run_subprocess('ssh master', ['ssh', '-M', '-N', '-f'] + options + [host], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        git_ssh_commands[host] = options
+    return git_ssh_commands[host]
+
+def git_environment(user_config):
+    import shlex
+    options = git_ssh_options(user_config)
+    if options is None:
+        return None
+    return dict(os.environ, GIT_SSH_COMMAND=' '.join(['ssh'] + [shlex.quote(option) for option in options]))
+
+def git_repository_url(user_config, repo):
+    return user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '/' + repo
+
+def git_error(cmd):
+    lines = cmd.stderr.decode('utf-8', 'replace').strip().splitlines()
+    for line in lines:
+        if line.startswith('fatal:'):
+            return line[len('fatal:'):].strip()
+    return lines[-1] if lines else 'git exited with code ' + str(cmd.returncode)
+
+def default_clone_jobs():
+    return min(MAX_CLONE_JOBS, (os.cpu_count() or 1) * 2)
+
+def clone_quiet(user_config, repo, env=None, reference=None):
+    import subprocess
+    start = time.time()
+    cmd = run_subprocess('git clone', ['git', 'clone', '--quiet'] + (['--reference-if-able', reference] if reference else []) + [git_repository_url(user_config, repo), repo], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    if cmd.returncode != 0:
+        raise GitError(git_error(cmd))
+    return 'cloned in ' + str(round(time.time() - start, 1)) + 's'
+
+def clone_many(user_config, repositories, jobs=None, shared=False):
+    skipped = [repo for repo in repositories if os.path.exists(repo)]
+    pending = [repo for repo in repositories if repo not in skipped]
+    env = git_environment(user_config) if pending else None
+    def action(repo):
+        if not shared:
+            return clone_quiet(user_config, repo, env)
+        return clone_quiet(user_config, repo, env, shared_object_store(user_config, repo, env))
+    print('Cloning', len(pending), 'repositories from \'' + user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '\'')
+    if skipped:
+        print('\033[37;44m INFO \033[0m Skipping', len(skipped), 'already existing:', ', '.join(skipped))
+    print()
+    if shared and pending:
+        try:
+            object_store()
+        except GitError as e:
+            print('\033[37;41m ERROR \033[0m', e)
+            return pending
+    return run_bulk(pending, action, jobs=jobs or default_clone_jobs())
+
+def new_many(user_config, repositories, jobs=None, clone_jobs=None):
+    import shutil
+    import concurrent.futures
+    client = get_client(user_config)
+    failures = []
+    counts = {'create': 0, 'clone': 0}
+    progress = sys.stdout.isatty()
+    def print_progress():
+        line = '[created ' + str(counts['create']) + '/' + str(len(repositories)) + ', cloned ' + str(counts['clone']) + '/' + str(len(repositories)) + ']'
+        print('\r\033[K\033[2m' + line[:shutil.get_terminal_size().columns - 1] + '\033[0m', end='', flush=True)
+    def prepare(repo):
+        client.create_repository(repo)
+        try:
+            client.set_acl(repo, 'ramassage-tek', 'r')
+        except BlihError as e:
+            return e
+        return None
+    def report(repo, stage, error):
+        failures.append(repo + ' (' + stage + ')')
+        print('\033[37;41m ERROR \033[0m\033[1m', repo, '\033[0m', stage + ':', error)
+    print('Creating', len(repositories), 'repositories and cloning them from \'' + user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '\'')
+    print()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or DEFAULT_JOBS)) as api, concurrent.futures.ThreadPoolExecutor(max_workers=max(1, clone_jobs or default_clone_jobs())) as git:
+        env = git.submit(git_environment, user_config)
+        pending = {api.submit(prepare, repo): ('create', repo) for repo in repositories}
+        while pending:
+            done, unfinished = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                stage, repo = pending.pop(future)
+                if progress:
+                    print('\r\033[K', end='')
+                try:
+                    result = future.result()
+                except (BlihError, GitError) as e:
+                    report(repo, stage, e)
+                    continue
+                if stage == 'create':
+                    counts['create'] += 1
+                    if result is not None:
+                        report(repo, 'acl', result)
+                    pending[git.submit(lambda repo: clone_quiet(user_config, repo, env.result()), repo)] = ('clone', repo)
+                else:
+                    counts['clone'] += 1
+                    print('\033[37;42m OK \033[0m\033[1m', repo, '\033[0m', 'created,', result)
+            if progress and pending:
+                print_progress()
+    print()
+    print('\033[37;44m INFO \033[0m', counts['clone'], 'ready,', len(failures), 'failed')
+    if failures:
+        print('\033[37;41m ERROR \033[0m Failed:', ', '.join(sorted(failures)))
+    return failures
+
+def git_origin_url(path):
+    section = None
+    try:
+        with open(os.path.join(path, '.git', 'config'), 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line.startswith('['):
+                    section = line.strip('[]').replace('"', '').split()
+                elif section == ['remote', 'origin'] and line.split('=')[0].strip() == 'url':
+                    return line.split('=', 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+def local_clones(user_config, directory):
+    prefix = git_repository_url(user_config, '')
+    clones = {}
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except OSError as e:
+        print('\033[37;41m ERROR \033[0m Can\'t open directory :', e)
+        sys.exit(1)
+    for entry in entries:
+        url = git_origin_url(entry.path) if entry.is_dir() else None
+        if url and url.startswith(prefix):
+            repo = url[len(prefix):]
+            clones[os.path.abspath(entry.path)] = repo[:-len('.git')] if repo.endswith('.git') else repo
+    return clones
+
+def remote_heads(user_config, repo, env=None):
+    import subprocess
+    cmd = run_subprocess('git ls-remote', ['git', 'ls-remote', '--heads', '--tags', git_repository_url(user_config, repo)], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    if cmd.returncode != 0:
+        raise GitError(git_error(cmd))
+    return dict(reversed(line.split('\t', 1)) for line in cmd.stdout.decode('utf-8', 'replace').splitlines() if '\t' in line)
+
+def sync(user_config, directory, jobs=None):
+    import subprocess
+    import concurrent.futures
+    clones = local_clones(user_config, directory)
+    existing = set(repository.name for repository in blih_request(get_client(user_config).repositories))
+    missing = sorted(path for path in clones if clones[path] not in existing)
+    paths = [path for path in clones if clones[path] in existing]
+    env = git_environment(user_config) if paths else None
+    store = get_sync_store()
+    seen = store.account(user_config)
+    print('Checking', len(paths), 'clones in \'' + directory + '\' against \'' + user_config[GIT_URL_IDENTIFIER] + ':' + user_config[USER_IDENTIFIER] + '\'')
+    if missing:
+        print('\033[37;44m INFO \033[0m Skipping', len(missing), 'clones of repositories that no longer exist:', ', '.join(os.path.basename(path) for path in missing))
+    heads = {}
+    failures = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or default_clone_jobs())) as executor:
+        futures = {executor.submit(remote_heads, user_config, clones[path], env): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                heads[futures[future]] = future.result()
+            except GitError as e:
+                failures.append(futures[future])
+                print('\033[37;41m ERROR \033[0m\033[1m', os.path.basename(futures[future]), '\033[0m', e)
+    changed = sorted(path for path in heads if seen.get(path) != heads[path])
+    print('\033[37;44m INFO \033[0m', len(heads) - len(changed), 'up to date,', len(changed), 'to update')
+    if changed:
+        print()
+    def action(path):
+        start = time.time()
+        cmd = run_subprocess('git pull', ['git', '-C', path, 'pull', '--ff-only', '--quiet'], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        if cmd.returncode != 0:
+            raise GitError(git_error(cmd))
+        seen[path] = heads[path]
+        return 'updated in ' + str(round(time.time() - start, 1)) + 's'
+    labels = {os.path.basename(path): path for path in changed}
+    failures += [labels[label] for label in run_bulk(list(labels), lambda label: action(labels[label]), jobs=jobs or default_clone_jobs())] if changed else []
+    for path in heads:
+        if path not in changed:
+            seen[path] = heads[path]
+    store.update(user_config, seen)
+    return failures
 
 def info(user_config, repo, out=True):
-    status, reason, headers, data = blih_request(user_config, '/repository/' + repo, method='GET')
+    import datetime
+    repository = blih_request(get_client(user_config).repository, repo)
     if out:
         print_logo()
         print('\033[1;33mNAME:\033[1;37m', repo, '\n')
-        if data['message']['url']:
-            print('\033[1;33m          Url:\033[0m', data['message']['url'])
-        if data['message']['uuid']:
-            print('\033[1;33m         UUID:\033[0m', data['message']['uuid'])
-        if data['message']['description']:
-            print('\033[1;33m  Description:\033[0m', data['message']['description'])
-        if data['message']['public']:
-            print('\033[1;33m       Public:\033[0m', data['message']['public'])
-        if data['message']['creation_time']:
-            print('\033[1;33mCreation date:\033[0m', datetime.datetime.fromtimestamp(int(data['message']['creation_time'])).strftime('%Y-%m-%d %H:%M:%S'))
+        if repository.url:
+            print('\033[1;33m          Url:\033[0m', repository.url)
+        if repository.uuid:
+            print('\033[1;33m         UUID:\033[0m', repository.uuid)
+        if repository.description:
+            print('\033[1;33m  Description:\033[0m', repository.description)
+        if repository.public is not None:
+            print('\033[1;33m       Public:\033[0m', repository.public)
+        if repository.creation_time:
+            print('\033[1;33mCreation date:\033[0m', datetime.datetime.fromtimestamp(repository.creation_time).strftime('%Y-%m-%d %H:%M:%S'))
         print()
         get_acl(user_config, repo)
         print('\n\033[2m© Louis Kleiver (louis.kleiver@gmail.com)\033[0m')
-    return data['message']
+    return repository
 
 def create(user_config, repo, description=None):
-    data = {
-        'name' : repo,
-        'type' : 'git'
-    }
-    if description:
-        data['description'] = description
-    status, reason, headers, data = blih_request(user_config, '/repositories', method='POST', data=data)
-    print('\033[37;44m INFO \033[0m', data['message'])
+    print('\033[37;44m INFO \033[0m', blih_write(user_config, 'create_repository', repo, description))
 
 def delete(user_config, repo):
-    status, reason, headers, data = blih_request(user_config, '/repository/' + repo, method='DELETE')
-    print('\033[37;44m INFO \033[0m', data['message'])
+    print('\033[37;44m INFO \033[0m', blih_write(user_config, 'delete_repository', repo))
 
 def sshkey_list(user_config):
-    status, reason, headers, data = blih_request(user_config, '/sshkeys', method='GET')
+    sshkeys = blih_request(get_client(user_config).sshkeys)
     print()
-    for i in data.keys():
-        print ('\033[1;33m' + i + '\033[0m')
-        print(data[i], end='\n\n')
+    for sshkey in sshkeys:
+        print ('\033[1;33m' + sshkey.name + '\033[0m \033[2m' + (ssh_key_fingerprint(sshkey.key) or '') + '\033[0m')
+        print(sshkey.key, end='\n\n')
 
 def sshkey_upload(user_config, filename):
     try:
@@ -211,24 +1886,116 @@ def sshkey_upload(user_config, filename):
     except:
         print("\033[37;41m ERROR \033[0m Can't open file : " + filename)
         sys.exit(1)
-    data = {
-        'sshkey' : urllib.parse.quote(file.read().strip('\n'))
-    }
+    key = file.read()
     file.close()
-    status, reason, headers, data = blih_request(user_config, '/sshkeys', method='POST', data=data)
-    print('\033[37;44m INFO \033[0m', data['message'])
+    print('\033[37;44m INFO \033[0m', blih_write(user_config, 'upload_sshkey', key))
 
 def sshkey_remove(user_config, sshkey):
-    status, reason, headers, data = blih_request(user_config, '/sshkey/' + sshkey, method='DELETE')
-    print('\033[37;44m INFO \033[0m', data['message'])
+    print('\033[37;44m INFO \033[0m', blih_write(user_config, 'remove_sshkey', sshkey))
+
+def ssh_key_fingerprint(key):
+    import base64
+    import binascii
+    import hashlib
+    import urllib.parse
+    parts = urllib.parse.unquote(key).split()
+    if len(parts) < 2:
+        return None
+    try:
+        blob = base64.b64decode(parts[1], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return 'SHA256:' + base64.b64encode(hashlib.sha256(blob).digest()).decode('ascii').rstrip('=')
+
+def read_ssh_keys(directory):
+    keys = []
+    errors = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.pub'):
+            continue
+        try:
+            with open(os.path.join(directory, filename), 'r') as file:
+                lines = [line.strip() for line in file if line.strip() and not line.startswith('#')]
+        except (OSError, UnicodeDecodeError) as e:
+            errors.append((filename, e.strerror if isinstance(e, OSError) else 'Not a text file'))
+            continue
+        for i, line in enumerate(lines):
+            label = filename if len(lines) == 1 else filename + ':' + str(i + 1)
+            fingerprint = ssh_key_fingerprint(line)
+            if fingerprint is None:
+                errors.append((label, 'Invalid ssh public key'))
+            else:
+                keys.append((label, line, fingerprint))
+    return keys, errors
+
+def plan_sshkeys(local, remote, prune=False):
+    remote_fingerprints = {}
+    plan = []
+    for sshkey in remote:
+        fingerprint = ssh_key_fingerprint(sshkey.key)
+        if fingerprint in remote_fingerprints and prune:
+            plan.append(('remove', sshkey.name, fingerprint))
+        remote_fingerprints.setdefault(fingerprint, sshkey.name)
+    local_fingerprints = set()
+    for label, key, fingerprint in local:
+        if fingerprint not in remote_fingerprints and fingerprint not in local_fingerprints:
+            plan.append(('upload', label, key, fingerprint))
+        local_fingerprints.add(fingerprint)
+    if prune:
+        for fingerprint, name in remote_fingerprints.items():
+            if fingerprint not in local_fingerprints:
+                plan.append(('remove', name, fingerprint))
+    return plan
+
+def print_sshkey_plan(plan, registered):
+    for step in plan:
+        if step[0] == 'upload':
+            print('\033[32m+ upload\033[0m', step[1], '\033[2m' + step[3] + '\033[0m')
+        else:
+            print('\033[31m- remove\033[0m', step[1], '\033[2m' + (step[2] or 'invalid key') + '\033[0m')
+    if plan:
+        print()
+    print('\033[37;44m INFO \033[0m', len([step for step in plan if step[0] == 'upload']), 'to upload,', len([step for step in plan if step[0] == 'remove']), 'to remove,', registered, 'already registered')
+
+def sshkey_sync(user_config, directory, prune=False, plan_only=False, jobs=None):
+    if not os.path.isdir(directory):
+        print('\033[37;41m ERROR \033[0m Not a directory : ' + directory)
+        sys.exit(1)
+    local, errors = read_ssh_keys(directory)
+    for label, error in errors:
+        print('\033[37;41m ERROR \033[0m\033[1m', label, '\033[0m', error)
+    client = get_client(user_config)
+    plan = plan_sshkeys(local, blih_request(client.sshkeys), prune=prune)
+    uploads = {step[1]: step for step in plan if step[0] == 'upload'}
+    removals = {step[1]: step for step in plan if step[0] == 'remove'}
+    print_sshkey_plan(plan, len(set(key[2] for key in local)) - len(uploads))
+    failures = [label for label, error in errors]
+    if plan_only or not plan:
+        return failures
+    print()
+    # Blih names an uploaded key after its comment: a key replaced under the same name is removed first
+    names = set(uploads[label][2].split()[2] for label in uploads if len(uploads[label][2].split()) > 2)
+    replaced = [name for name in removals if name in names]
+    def upload_action(label):
+        return client.upload_sshkey(uploads[label][2])
+    def remove_action(name):
+        return client.remove_sshkey(name)
+    if replaced:
+        failures += run_bulk(replaced, remove_action, jobs=jobs)
+    if uploads:
+        failures += run_bulk(list(uploads), upload_action, jobs=jobs)
+    if len(removals) > len(replaced):
+        failures += run_bulk([name for name in removals if name not in replaced], remove_action, jobs=jobs)
+    return failures
 
 def ping(user_config, to='blih'):
+    import subprocess
     if to == "blih":
-        status, reason, headers, data = blih_request(user_config, '/whoami', method='GET')
+        user = blih_request(get_client(user_config).whoami)
         print_logo()
-        print('\033[37;42m OK \033[0m Successfuly connected to\033[1m', user_config[BLIH_URL_IDENTIFIER], '\033[0mas\033[1m', data['message'], '\033[0m')
+        print('\033[37;42m OK \033[0m Successfuly connected to\033[1m', user_config[BLIH_URL_IDENTIFIER], '\033[0mas\033[1m', user, '\033[0m')
     elif to == "git":
-        cmd = subprocess.run(["ssh", user_config[GIT_URL_IDENTIFIER]], check=False, stdout=subprocess.PIPE)
+        cmd = run_subprocess('ssh', ["ssh"] + (git_ssh_options(user_config) or []) + [user_config[GIT_URL_IDENTIFIER]], check=False, stdout=subprocess.PIPE)
         if cmd.returncode == 128:
             print('\033[37;42m OK \033[0m Successfuly connected to\033[1m', user_config[GIT_URL_IDENTIFIER], '\033[0mas\033[1m', cmd.stdout.decode('utf-8').split(' ')[1].split('!')[0], '\033[0m')
         else:
@@ -237,7 +2004,132 @@ def ping(user_config, to='blih'):
         print('\033[37;41m ERROR \033[0m Invalid target', to)
         sys.exit(1)
 
+class NameIndex:
+    def __init__(self, names):
+        self.names = list(names)
+        self.lowered = [name.lower() for name in self.names]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.chars = {}
+        self.trigrams = {}
+        for i, name in enumerate(self.lowered):
+            for char in set(name):
+                self.chars.setdefault(char, []).append(i)
+            for trigram in set(name[j:j + 3] for j in range(len(name) - 2)):
+                self.trigrams.setdefault(trigram, []).append(i)
+        self.query = ''
+        self.last = ('', None, list(range(len(self.names))))
+
+    def intersect(self, postings):
+        postings = sorted(postings, key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+        return result
+
+    def candidates(self, query):
+        if self.last[0] and query.startswith(self.last[0]):
+            return sorted(self.last[1])
+        return sorted(self.intersect([self.chars.get(char, ()) for char in set(query)]))
+
+    def search(self, query):
+        import re
+        query = query.lower()
+        if not query:
+            self.last = ('', None, list(range(len(self.names))))
+        if query == self.last[0]:
+            return self.last[2]
+        substrings = None
+        if len(query) >= 3:
+            substrings = self.intersect([self.trigrams.get(query[j:j + 3], ()) for j in range(len(query) - 2)])
+        fuzzy_match = re.compile(re.escape(query[0]) + ''.join('[^' + re.escape(char) + ']*' + re.escape(char) for char in query[1:])).search
+        prefixes = []
+        others = []
+        fuzzy = []
+        for i in self.candidates(query):
+            name = self.lowered[i]
+            if (substrings is None or i in substrings) and query in name:
+                (prefixes if name.startswith(query) else others).append(i)
+            elif fuzzy_match(name):
+                fuzzy.append(i)
+        matches = prefixes + others + fuzzy
+        self.last = (query, set(matches), matches)
+        return matches
+
+    def filtered(self):
+        return [self.names[i] for i in self.search(self.query)]
+
+    def matched(self, name):
+        return name in self.positions and (self.last[1] is None or self.positions[name] in self.last[1])
+
+class RepositoryDetails:
+    def __init__(self, user_config, workers=GUI_PREFETCH_WORKERS):
+        import threading
+        self.user_config = user_config
+        self.workers = workers
+        self.threads = []
+        self.lock = threading.Condition()
+        self.details = {}
+        self.generations = {}
+        self.wanted = []
+        self.pending = set()
+
+    def load(self, repo):
+        try:
+            client = get_client(self.user_config)
+            return (client.repository(repo), client.acls(repo))
+        except BlihError as e:
+            return e
+
+    def worker(self):
+        while True:
+            with self.lock:
+                while not self.wanted:
+                    self.lock.wait()
+                repo = self.wanted.pop()
+                if repo is None:
+                    return
+                generation = self.generations.get(repo, 0)
+                self.pending.add(repo)
+            result = self.load(repo)
+            with self.lock:
+                self.pending.discard(repo)
+                if self.generations.get(repo, 0) == generation:
+                    self.details[repo] = result
+                self.lock.notify_all()
+
+    def prefetch(self, repos):
+        import threading
+        with self.lock:
+            self.wanted = [repo for repo in reversed(repos) if repo not in self.details and repo not in self.pending]
+            while self.wanted and len(self.threads) < self.workers:
+                self.threads.append(threading.Thread(target=self.worker, daemon=True))
+                self.threads[-1].start()
+            self.lock.notify_all()
+
+    def prefetch_around(self, names, pos, radius=GUI_PREFETCH_RADIUS):
+        window = range(max(0, pos - radius), min(len(names), pos + radius + 1))
+        self.prefetch([names[i] for i in sorted(window, key=lambda i: abs(i - pos))])
+
+    def get(self, repo):
+        with self.lock:
+            return self.details.get(repo)
+
+    def stop(self):
+        with self.lock:
+            self.wanted = [None] * len(self.threads)
+            self.lock.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def invalidate(self, repo):
+        with self.lock:
+            self.details.pop(repo, None)
+            self.generations[repo] = self.generations.get(repo, 0) + 1
+        get_cache().invalidate(self.user_config, ['/repository/' + repo, '/repository/' + repo + '/acls'])
+
 def gui_init():
+    import curses
     stdscr = curses.initscr()
     curses.noecho()
     curses.cbreak()
@@ -248,41 +2140,91 @@ def gui_init():
     curses.init_pair(3, curses.COLOR_YELLOW, curses.COLOR_BLACK)
     curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_CYAN)
     curses.curs_set(0)
+    if hasattr(curses, 'set_escdelay'):
+        curses.set_escdelay(GUI_ESCAPE_DELAY)
     return (stdscr)
 
 def gui_print_header(stdscr):
+    import curses
     stdscr.addstr(0, 0, '   ___  ___ __     ___      __  __         ', curses.color_pair(1))
     stdscr.addstr(1, 0, '  / _ )/ (_) /    / _ )___ / /_/ /____ ____', curses.color_pair(1))
     stdscr.addstr(2, 0, ' / _  / / / _ \  / _  / -_) __/ __/ -_) __/', curses.color_pair(1))
     stdscr.addstr(3, 0, '/____/_/_/_//_/ /____/\__/\__/\__/\__/_/   ', curses.color_pair(1))
 
+def gui_clear(stdscr):
+    stdscr.move(GUI_BODY_Y, 0)
+    stdscr.clrtobot()
+
+def gui_refresh(stdscr):
+    import curses
+    stdscr.noutrefresh()
+    curses.doupdate()
+
 def gui_info(stdscr, message):
-    stdscr.clear()
-    gui_print_header(stdscr)
+    import curses
+    gui_clear(stdscr)
     stdscr.addstr(6, 0, ' INFO ', curses.color_pair(4))
-    stdscr.addstr(6, 7, message)
-    stdscr.refresh()
+    stdscr.addstr(6, 7, str(message))
+    gui_refresh(stdscr)
     stdscr.getch()
 
-def gui_list(stdscr, menu_list, x, y, width=18, heigth=14, pos=0, view_pos=0, loop=True, selection=True, print_only=False):
+def gui_list_row(stdscr, menu_list, i, x, y, width, view_pos, highlight):
+    import curses
+    stdscr.addstr(y + 1 + i - view_pos, x + 1, menu_list[i][0:width - 1].ljust(width - 1), curses.A_REVERSE if highlight else 0)
+
+def gui_list(stdscr, menu_list, x, y, width=18, heigth=14, pos=0, view_pos=0, loop=True, selection=True, print_only=False, search=None, commands=None, on_move=None):
+    import curses
+    from curses.textpad import rectangle
     return_value = 'quit'
-    rectangle(stdscr, y, x, y + heigth, x + width)
+    drawn = None
+    query = None
     while True:
-        for i in range(0, len(menu_list) if len(menu_list) <= heigth - 1 else heigth - 1):
-            stdscr.addstr(y + 1 + i, x + 1, menu_list[i + view_pos][0:width-1] + ' ' * ((width - 1) - len(menu_list[i + view_pos])), curses.A_REVERSE if (selection and pos == i + view_pos) else 0)
-        stdscr.refresh()
+        if search is not None and query != search.query:
+            selected = menu_list[pos] if pos < len(menu_list) else None
+            menu_list = search.filtered()
+            pos = menu_list.index(selected) if search.matched(selected) else 0
+            view_pos = max(0, min(view_pos, pos, len(menu_list) - heigth + 1), pos - heigth + 2)
+            query = search.query
+            drawn = None
+        if drawn is None:
+            rectangle(stdscr, y, x, y + heigth, x + width)
+            if search is not None and search.query:
+                stdscr.addstr(y + heigth, x + 2, (' /' + search.query + ' ')[-(width - 3):], curses.color_pair(3))
+        if drawn is None or drawn[1] != view_pos:
+            rows = range(view_pos, view_pos + heigth - 1)
+        else:
+            rows = [i for i in set((drawn[0], pos)) if i < len(menu_list)]
+        for i in rows:
+            if i < len(menu_list):
+                gui_list_row(stdscr, menu_list, i, x, y, width, view_pos, selection and pos == i)
+            else:
+                stdscr.addstr(y + 1 + i - view_pos, x + 1, ' ' * (width - 1))
+        if on_move is not None and drawn != (pos, view_pos) and menu_list:
+            on_move(menu_list, pos)
+        drawn = (pos, view_pos)
+        gui_refresh(stdscr)
         if print_only:
             return ('', pos, view_pos)
         c = stdscr.getch()
         if not loop:
             return (c, pos, view_pos)
-        if c == ord('q') or c == curses.KEY_LEFT or c == 27:
+        if search is not None and c == 27 and search.query:
+            search.query = ''
+        elif search is not None and (c == curses.KEY_BACKSPACE or c == 127 or c == 8):
+            search.query = search.query[:-1]
+        elif search is not None and 32 < c < 127:
+            search.query += chr(c)
+        elif commands is not None and c in commands:
+            return (commands[c], pos, view_pos)
+        elif (c == ord('q') and search is None) or c == curses.KEY_LEFT or c == 27:
             return_value = 'quit'
             break
+        elif not menu_list:
+            continue
         elif c == curses.KEY_UP:
             if pos == 0:
                 pos = len(menu_list) - 1
-                if len(menu_list) > heigth:
+                if len(menu_list) > heigth - 1:
                     view_pos = len(menu_list) - heigth + 1
             else:
                 if pos - view_pos == 0:
@@ -296,6 +2238,12 @@ def gui_list(stdscr, menu_list, x, y, width=18, heigth=14, pos=0, view_pos=0, lo
                 if pos - view_pos == heigth - 2:
                     view_pos += 1
                 pos += 1
+        elif c == curses.KEY_PPAGE:
+            pos = max(0, pos - heigth + 1)
+            view_pos = max(0, view_pos - heigth + 1)
+        elif c == curses.KEY_NPAGE:
+            pos = min(len(menu_list) - 1, pos + heigth - 1)
+            view_pos = max(0, min(view_pos + heigth - 1, len(menu_list) - heigth + 1))
         elif c == ord('\n') or c == curses.KEY_RIGHT:
             return (menu_list[pos], pos, view_pos)
     for i in range(y, y + heigth + 1):
@@ -303,21 +2251,23 @@ def gui_list(stdscr, menu_list, x, y, width=18, heigth=14, pos=0, view_pos=0, lo
     return (return_value, pos, view_pos)
 
 def gui_acl_add(user_config, stdscr, repo, buser='', r=False, w=False, a=False, canBeDeleted=False):
+    import curses
     user = buser
     max_select = (6 if canBeDeleted else 5)
     selection = 0
-    stdscr.clear()
-    gui_print_header(stdscr)
-    stdscr.addstr(6, 1, 'USER:', (curses.color_pair(3) | curses.A_BOLD) if selection == 0 else curses.color_pair(3))
-    stdscr.addstr(8, 6, ' READ ', (curses.A_BOLD if selection == 1 else curses.A_NORMAL) | (curses.color_pair(4) if r else curses.COLOR_WHITE))
-    stdscr.addstr(8, 14, ' WRITE ', (curses.A_BOLD if selection == 2 else curses.A_NORMAL) | (curses.color_pair(4) if w else curses.COLOR_WHITE))
-    stdscr.addstr(8, 23, ' ADMIN ', (curses.A_BOLD if selection == 3 else curses.A_NORMAL) | (curses.color_pair(4) if a else curses.COLOR_WHITE))
-    stdscr.addstr(10, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 4 else curses.A_NORMAL)
-    stdscr.addstr(10, 16, ' SAVE ' if canBeDeleted else ' ADD ', (curses.color_pair(4) | curses.A_BOLD) if selection == 5 else curses.A_NORMAL)
-    if canBeDeleted:
-        stdscr.addstr(10, 25, ' REMOVE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 6 else curses.A_NORMAL)
-    stdscr.addstr(6, 7, user)
+    gui_clear(stdscr)
     while True:
+        stdscr.addstr(6, 1, 'USER:', (curses.color_pair(3) | curses.A_BOLD) if selection == 0 else curses.color_pair(3))
+        stdscr.addstr(8, 6, ' READ ', (curses.A_BOLD if selection == 1 else curses.A_NORMAL) | (curses.color_pair(4) if r else curses.COLOR_WHITE))
+        stdscr.addstr(8, 14, ' WRITE ', (curses.A_BOLD if selection == 2 else curses.A_NORMAL) | (curses.color_pair(4) if w else curses.COLOR_WHITE))
+        stdscr.addstr(8, 23, ' ADMIN ', (curses.A_BOLD if selection == 3 else curses.A_NORMAL) | (curses.color_pair(4) if a else curses.COLOR_WHITE))
+        stdscr.addstr(10, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 4 else curses.A_NORMAL)
+        stdscr.addstr(10, 16, ' SAVE ' if canBeDeleted else ' ADD ', (curses.color_pair(4) | curses.A_BOLD) if selection == 5 else curses.A_NORMAL)
+        if canBeDeleted:
+            stdscr.addstr(10, 24, ' REMOVE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 6 else curses.A_NORMAL)
+        stdscr.addstr(6, 7, user)
+        stdscr.clrtoeol()
+        gui_refresh(stdscr)
         cmd = stdscr.getch()
         if cmd == 27:
             return
@@ -349,101 +2299,94 @@ def gui_acl_add(user_config, stdscr, repo, buser='', r=False, w=False, a=False,
                 w = False
                 a = False
                 break
-        elif buser == '' and selection == 0 and (str(chr(cmd)).isalnum() or chr(cmd) == '.' or chr(cmd) == '@' or chr(cmd) == '-' or chr(cmd) == '_') and len(user) < 64:
+        elif buser == '' and selection == 0 and 0 <= cmd < 256 and (str(chr(cmd)).isalnum() or chr(cmd) == '.' or chr(cmd) == '@' or chr(cmd) == '-' or chr(cmd) == '_') and len(user) < 64:
             user += str(chr(cmd))
         elif buser == '' and cmd == ord('\x7f'):
             user = user[:-1]
-        stdscr.clear()
-        gui_print_header(stdscr)
-        stdscr.addstr(6, 1, 'USER:', (curses.color_pair(3) | curses.A_BOLD) if selection == 0 else curses.color_pair(3))
-        stdscr.addstr(8, 6, ' READ ', (curses.A_BOLD if selection == 1 else curses.A_NORMAL) | (curses.color_pair(4) if r else curses.COLOR_WHITE))
-        stdscr.addstr(8, 14, ' WRITE ', (curses.A_BOLD if selection == 2 else curses.A_NORMAL) | (curses.color_pair(4) if w else curses.COLOR_WHITE))
-        stdscr.addstr(8, 23, ' ADMIN ', (curses.A_BOLD if selection == 3 else curses.A_NORMAL) | (curses.color_pair(4) if a else curses.COLOR_WHITE))
-        stdscr.addstr(10, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 4 else curses.A_NORMAL)
-        stdscr.addstr(10, 16, ' SAVE ' if canBeDeleted else ' ADD ', (curses.color_pair(4) | curses.A_BOLD) if selection == 5 else curses.A_NORMAL)
-        if canBeDeleted:
-            stdscr.addstr(10, 24, ' REMOVE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 6 else curses.A_NORMAL)
-        stdscr.addstr(6, 7, user)
     acls = '' + ('r' if r else '') + ('w' if w else '') + ('a' if a else '')
-    status, reason, headers, data = blih_request(user_config, '/repository/' + repo + '/acls', method='POST', data={'user': user, 'acl': acls}, gui=True)
-    gui_info(stdscr, data['message'])
+    gui_info(stdscr, blih_request(get_client(user_config).set_acl, repo, user, acls, gui=True))
+
+def gui_repo_details(stdscr, repo, repo_data):
+    import curses
+    import datetime
+    gui_clear(stdscr)
+    stdscr.addstr(6, 1, 'NAME:', curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(6, 7, repo)
+    stdscr.addstr(8, 12, "Url:", curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(9, 11, "UUID:", curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(10, 4, "Description:", curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(11, 9, "Public:", curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(12, 2, "Creation date:", curses.color_pair(3) | curses.A_BOLD)
+    stdscr.addstr(8, 17, repo_data.url if repo_data.url else '???')
+    stdscr.addstr(9, 17, repo_data.uuid if repo_data.uuid else '???')
+    stdscr.addstr(10, 17, repo_data.description if repo_data.description else '???')
+    stdscr.addstr(11, 17, str(repo_data.public) if repo_data.public is not None else '???')
+    stdscr.addstr(12, 17, datetime.datetime.fromtimestamp(repo_data.creation_time).strftime('%Y-%m-%d %H:%M:%S') if repo_data.creation_time else '???')
+    stdscr.addstr(14, 28, 'ACLs:', curses.color_pair(3))
+
+def gui_repo_wait(stdscr, details, repo):
+    import curses
+    result = details.get(repo)
+    if result is None:
+        gui_clear(stdscr)
+        stdscr.addstr(6, 1, 'NAME:', curses.color_pair(3) | curses.A_BOLD)
+        stdscr.addstr(6, 7, repo)
+        stdscr.addstr(8, 2, ' LOADING ', curses.color_pair(4))
+        gui_refresh(stdscr)
+        details.prefetch([repo])
+        stdscr.timeout(GUI_POLL_DELAY)
+        while result is None:
+            c = stdscr.getch()
+            if c == ord('q') or c == curses.KEY_LEFT or c == 27:
+                break
+            result = details.get(repo)
+        stdscr.timeout(-1)
+    if isinstance(result, BlihError):
+        gui_exit()
+        print('\033[37;41m ERROR \033[0m', result)
+        sys.exit(result.code if result.code >= 400 else 1)
+    return result
 
-def gui_repo(user_config, stdscr, repo):
+def gui_repo(user_config, stdscr, repo, details):
+    import curses
     pos = 0
     view_pos = 0
     while True:
-        status, reason, headers, data = blih_request(user_config, '/repository/' + repo, method='GET', gui=True)
-        repo_data = data['message']
-        stdscr.clear()
-        gui_print_header(stdscr)
-        stdscr.addstr(6, 1, 'NAME:', curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(6, 7, repo)
-        stdscr.addstr(8, 12, "Url:", curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(9, 11, "UUID:", curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(10, 4, "Description:", curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(11, 9, "Public:", curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(12, 2, "Creation date:", curses.color_pair(3) | curses.A_BOLD)
-        stdscr.addstr(8, 17, repo_data['url'] if repo_data['url'] else '???')
-        stdscr.addstr(9, 17, repo_data['uuid'] if repo_data['uuid'] else '???')
-        stdscr.addstr(10, 17, repo_data['description'] if repo_data['description'] else '???')
-        stdscr.addstr(11, 17, repo_data['public'] if repo_data['public'] else '???')
-        stdscr.addstr(12, 17, datetime.datetime.fromtimestamp(int(repo_data['creation_time'])).strftime('%Y-%m-%d %H:%M:%S') if repo_data['creation_time'] else '???')
-        status, reason, headers, data = blih_request(user_config, '/repository/' + repo + '/acls', method='GET', gui=True)
-        acl_users = []
-        if type(data) != type(""):
-            for i in data.keys():
-                acl_users.append(i)
-        stdscr.addstr(14, 28, 'ACLs:', curses.color_pair(3))
+        result = gui_repo_wait(stdscr, details, repo)
+        if result is None:
+            return ''
+        repo_data, acls = result
+        gui_repo_details(stdscr, repo, repo_data)
+        acl_users = [acl.user for acl in acls]
         gui_list(stdscr, acl_users, 26, 15, width=32, heigth=5, selection=False, print_only=True)
-        stdscr.refresh()
-        cmd, pos, view_pos = gui_list(stdscr, ['add acls', 'edit acls', 'delete repository'], 1, 15, width=19, heigth=5, pos=pos, view_pos=view_pos)
+        cmd, pos, view_pos = gui_list(stdscr, ['add acls', 'edit acls', 'delete repository'], 1, 15, width=19, heigth=5, pos=pos, view_pos=view_pos, commands={ord('r'): 'refresh'})
         if cmd == 'quit':
             return ''
-        if cmd == 'add acls':
+        if cmd == 'refresh':
+            details.invalidate(repo)
+        elif cmd == 'add acls':
             gui_acl_add(user_config, stdscr, repo)
+            details.invalidate(repo)
         elif cmd == 'edit acls':
             acls_pos = 0
             acls_view_pos = 0
             while len(acl_users) > 0:
-                stdscr.clear()
-                gui_print_header(stdscr)
-                stdscr.addstr(6, 1, 'NAME:', curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(6, 7, repo)
-                stdscr.addstr(8, 12, "Url:", curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(9, 11, "UUID:", curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(10, 4, "Description:", curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(11, 9, "Public:", curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(12, 2, "Creation date:", curses.color_pair(3) | curses.A_BOLD)
-                stdscr.addstr(8, 17, repo_data['url'] if repo_data['url'] else '???')
-                stdscr.addstr(9, 17, repo_data['uuid'] if repo_data['uuid'] else '???')
-                stdscr.addstr(10, 17, repo_data['description'] if repo_data['description'] else '???')
-                stdscr.addstr(11, 17, repo_data['public'] if repo_data['public'] else '???')
-                stdscr.addstr(12, 17, datetime.datetime.fromtimestamp(int(repo_data['creation_time'])).strftime('%Y-%m-%d %H:%M:%S') if repo_data['creation_time'] else '???')
-                stdscr.addstr(14, 28, 'ACLs:', curses.color_pair(3))
-                gui_list(stdscr, ['add acls', 'edit acls', 'delete repository'], 1, 15, width=19, heigth=5, pos=pos, view_pos=view_pos, print_only=True)
                 acls_cmd, acls_pos, acls_view_pos = gui_list(stdscr, acl_users, 26, 15, width=32, heigth=5, pos=acls_pos, view_pos=acls_view_pos, print_only=True)
-                r = False
-                w = False
-                a = False
-                for el in data.keys():
-                    if acl_users[acls_pos] == el and ('r' in data[el]):
-                        r = True
-                    if acl_users[acls_pos] == el and ('w' in data[el]):
-                        w = True
-                    if acl_users[acls_pos] == el and ('a' in data[el]):
-                        a = True
+                r = acls[acls_pos].read
+                w = acls[acls_pos].write
+                a = acls[acls_pos].admin
                 stdscr.addstr(16, 62, ' READ ', (curses.A_BOLD | curses.color_pair(4) if r else curses.A_NORMAL))
                 stdscr.addstr(17, 62, ' WRITE ', (curses.A_BOLD | curses.color_pair(4) if w else curses.A_NORMAL))
                 stdscr.addstr(18, 62, ' ADMIN ', (curses.A_BOLD | curses.color_pair(4) if a else curses.A_NORMAL))
-                stdscr.refresh()
+                gui_refresh(stdscr)
                 acls_cmd = stdscr.getch()
                 if acls_cmd == ord('q') or acls_cmd == curses.KEY_LEFT or acls_cmd == 27:
                     break
                 elif acls_cmd == curses.KEY_UP:
                     if acls_pos == 0:
                         acls_pos = len(acl_users) - 1
-                        if len(acl_users) > 5:
-                            acls_view_pos = len(acl_users) - 6
+                        if len(acl_users) > 4:
+                            acls_view_pos = len(acl_users) - 4
                     else:
                         if acls_pos - acls_view_pos == 0:
                             acls_view_pos -= 1
@@ -458,23 +2401,24 @@ def gui_repo(user_config, stdscr, repo):
                         acls_pos += 1
                 else:
                     gui_acl_add(user_config, stdscr, repo, buser=acl_users[acls_pos], r=r, w=w, a=a, canBeDeleted=True)
+                    details.invalidate(repo)
                     break
         elif cmd == 'delete repository':
             selection = False
+            gui_clear(stdscr)
+            stdscr.addstr(8, 2, 'You really want to delete \"' + repo + '\" ?', curses.A_BOLD)
             while True:
-                stdscr.clear()
-                gui_print_header(stdscr)
-                stdscr.addstr(8, 2, 'You really want to delete \"' + repo + '\" ?', curses.A_BOLD)
                 stdscr.addstr(10, 6, ' NO ', (curses.color_pair(4) | curses.A_BOLD) if not selection else curses.A_NORMAL)
                 stdscr.addstr(10, 14, ' YES ', (curses.color_pair(4) | curses.A_BOLD) if selection else curses.A_NORMAL)
-                stdscr.refresh()
+                gui_refresh(stdscr)
                 cmd = stdscr.getch()
                 if cmd == curses.KEY_LEFT or cmd == curses.KEY_RIGHT or cmd == curses.KEY_UP or cmd == curses.KEY_DOWN:
                     selection = not selection
                 elif cmd == ord('\n'):
                     if selection:
-                        status, reason, headers, data = blih_request(user_config, '/repository/' + repo, method='DELETE', gui=True)
-                        gui_info(stdscr, data['message'])
+                        message = blih_request(get_client(user_config).delete_repository, repo, gui=True)
+                        details.invalidate(repo)
+                        gui_info(stdscr, message)
                         return 'quit'
                     else:
                         break
@@ -482,32 +2426,43 @@ def gui_repo(user_config, stdscr, repo):
                     break
 
 def gui_repo_list(user_config, stdscr):
+    import bisect
     cmd = ''
-    status, reason, headers, data = blih_request(user_config, '/repositories', method='GET', gui=True)
+    gui_clear(stdscr)
+    gui_list(stdscr, ['new repository', 'repositories', 'quit'], 0, 6, pos=1, print_only=True)
     repositories = []
+    drawn = time.monotonic()
+    for repository in blih_stream(get_client(user_config).iter_repositories, gui=True):
+        bisect.insort(repositories, repository.name)
+        if time.monotonic() - drawn > GUI_STREAM_DELAY:
+            gui_list(stdscr, repositories, 20, 6, 42, selection=False, print_only=True)
+            drawn = time.monotonic()
+    search = NameIndex(repositories)
+    details = RepositoryDetails(user_config)
     pos = 0
     view_pos = 0
-    for repo in data['repositories']:
-        repositories.append(repo)
-    repositories.sort()
-    while cmd != 'quit':
-        stdscr.clear()
-        gui_print_header(stdscr)
-        gui_list(stdscr, ['new repository', 'repositories', 'quit'], 0, 6, pos=1, print_only=True)
-        cmd, pos, view_pos = gui_list(stdscr, repositories, 20, 6, 42, pos=pos, view_pos=view_pos)
-        if cmd != '' and cmd != 'quit':
-            cmd = gui_repo(user_config, stdscr, cmd)
+    try:
+        while cmd != 'quit':
+            gui_clear(stdscr)
+            gui_list(stdscr, ['new repository', 'repositories', 'quit'], 0, 6, pos=1, print_only=True)
+            cmd, pos, view_pos = gui_list(stdscr, search.filtered(), 20, 6, 42, pos=pos, view_pos=view_pos, search=search, on_move=details.prefetch_around)
+            if cmd != '' and cmd != 'quit':
+                cmd = gui_repo(user_config, stdscr, cmd, details)
+    finally:
+        details.stop()
 
 def gui_repo_new(user_config, stdscr):
+    import curses
     name = ''
     selection = 0
-    stdscr.clear()
-    gui_print_header(stdscr)
-    stdscr.addstr(6, 1, 'REPOSITORY NAME:', (curses.color_pair(3) | curses.A_BOLD) if selection < 2 else curses.color_pair(3))
-    stdscr.addstr(8, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 2 else curses.A_NORMAL)
-    stdscr.addstr(8, 16, ' CREATE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 3 else curses.A_NORMAL)
-    stdscr.addstr(6, 18, name)
+    gui_clear(stdscr)
     while True:
+        stdscr.addstr(6, 1, 'REPOSITORY NAME:', (curses.color_pair(3) | curses.A_BOLD) if selection < 2 else curses.color_pair(3))
+        stdscr.addstr(8, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 2 else curses.A_NORMAL)
+        stdscr.addstr(8, 16, ' CREATE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 3 else curses.A_NORMAL)
+        stdscr.addstr(6, 18, name)
+        stdscr.clrtoeol()
+        gui_refresh(stdscr)
         cmd = stdscr.getch()
         if cmd == 27:
             return
@@ -524,28 +2479,21 @@ def gui_repo_new(user_config, stdscr):
                 return
             elif selection == 3:
                 break
-        elif selection < 2 and (str(chr(cmd)).isalnum() or chr(cmd) == '-' or chr(cmd) == '_') and len(name) < 64:
+        elif selection < 2 and 0 <= cmd < 256 and (str(chr(cmd)).isalnum() or chr(cmd) == '-' or chr(cmd) == '_') and len(name) < 64:
             name += str(chr(cmd))
         elif cmd == ord('\x7f'):
             name = name[:-1]
-        stdscr.clear()
-        gui_print_header(stdscr)
-        stdscr.addstr(6, 1, 'REPOSITORY NAME:', (curses.color_pair(3) | curses.A_BOLD) if selection < 2 else curses.color_pair(3))
-        stdscr.addstr(8, 4, ' CANCEL ', (curses.color_pair(4) | curses.A_BOLD) if selection == 2 else curses.A_NORMAL)
-        stdscr.addstr(8, 16, ' CREATE ', (curses.color_pair(4) | curses.A_BOLD) if selection == 3 else curses.A_NORMAL)
-        stdscr.addstr(6, 18, name)
-    status, reason, headers, data = blih_request(user_config, '/repositories', method='POST', data={'name': name, 'type': 'git'}, gui=True)
-    gui_info(stdscr, data['message'])
+    gui_info(stdscr, blih_request(get_client(user_config).create_repository, name, gui=True))
 
 def gui(user_config):
+    import curses
     stdscr = gui_init()
     gui_print_header(stdscr)
     cmd = ''
     pos = 0
     view_pos = 0
     while cmd != 'quit':
-        stdscr.clear()
-        gui_print_header(stdscr)
+        gui_clear(stdscr)
         cmd, pos, view_pos = gui_list(stdscr, ['new repository', 'repositories', 'quit'], 0, 6, pos=pos, view_pos=0)
         if (cmd == 'new repository'):
             gui_repo_new(user_config, stdscr)
@@ -557,10 +2505,296 @@ def gui(user_config):
     curses.endwin()
 
 def gui_exit():
+    import curses
     curses.nocbreak()
     curses.echo()
     curses.endwin()
 
+def agent_socket_path():
+    path = os.environ.get(AGENT_ENVIRONMENT, '')
+    if path not in ('', '0', '1'):
+        return path
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'blihbetter-agent.sock')
+    return os.path.join('/tmp', 'blihbetter-' + str(os.getuid()), 'agent.sock')
+
+def agent_send(connection, kind, payload=b''):
+    import struct
+    connection.sendall(struct.pack(AGENT_HEADER, kind, len(payload)) + payload)
+
+def agent_receive(connection):
+    import struct
+    header = agent_read(connection, struct.calcsize(AGENT_HEADER))
+    if header is None:
+        return (None, None)
+    kind, length = struct.unpack(AGENT_HEADER, header)
+    return (kind, agent_read(connection, length))
+
+def agent_read(connection, size):
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def agent_connect():
+    path = agent_socket_path()
+    if os.environ.get(AGENT_ENVIRONMENT) == '0' or not os.path.exists(path):
+        return None
+    import stat
+    try:
+        directory = os.lstat(os.path.dirname(os.path.abspath(path)))
+        info = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(directory.st_mode) or directory.st_uid != os.getuid() or stat.S_IMODE(directory.st_mode) != 0o700:
+        return None
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return None
+    import socket
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+def agent_forward(argv):
+    import marshal
+    connection = agent_connect()
+    if connection is None:
+        return None
+    tty = sys.stdout.isatty()
+    request = {
+        'version': BLIHBETTER_VERSION,
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'tty': tty,
+        'columns': os.get_terminal_size(sys.stdout.fileno()).columns if tty else 0
+    }
+    with connection:
+        try:
+            agent_send(connection, b'r', marshal.dumps(request))
+            while True:
+                kind, payload = agent_receive(connection)
+                if kind in (b'o', b'e'):
+                    stream = sys.stdout if kind == b'o' else sys.stderr
+                    stream.buffer.write(payload)
+                    stream.flush()
+                elif kind == b'x':
+                    return int(payload)
+                elif kind == b'v':
+                    return None
+                else:
+                    break
+        except OSError:
+            pass
+    print('\033[37;41m ERROR \033[0m Connection to the agent lost', file=sys.stderr)
+    return 1
+
+class AgentStream:
+    def __init__(self, connection, kind, tty=False):
+        self.connection = connection
+        self.kind = kind
+        self.tty = tty
+        self.encoding = 'utf-8'
+        self.pending = []
+        self.closed = False
+
+    def write(self, text):
+        self.pending.append(text)
+        if '\n' in text or '\r' in text:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        data = ''.join(self.pending).encode('utf-8', 'replace')
+        self.pending = []
+        if data and not self.closed:
+            try:
+                agent_send(self.connection, self.kind, data)
+            except OSError:
+                self.closed = True
+
+    def isatty(self):
+        return self.tty
+
+class BlihAgent:
+    def __init__(self, path):
+        import threading
+        self.path = path
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.running = False
+        self.server = None
+
+    def listen(self):
+        import socket
+        private_directory(os.path.dirname(self.path))
+        connection = agent_connect()
+        if connection is not None:
+            connection.close()
+            raise OSError('An agent is already listening on \'' + self.path + '\'')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.server.listen(64)
+        self.server.settimeout(1)
+
+    def serve(self):
+        import socket
+        import threading
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    connection, address = self.server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+        finally:
+            self.server.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.running = False
+
+    def handle(self, connection):
+        import marshal
+        with connection:
+            try:
+                kind, payload = agent_receive(connection)
+                if kind == b'r':
+                    self.run(connection, marshal.loads(payload))
+                elif kind == b's':
+                    agent_send(connection, b's', marshal.dumps({'pid': os.getpid(), 'version': BLIHBETTER_VERSION, 'uptime': time.time() - self.started, 'requests': self.requests}))
+                elif kind == b'q':
+                    self.stop()
+                    agent_send(connection, b'x', b'0')
+            except (OSError, ValueError, EOFError, TypeError):
+                pass
+
+    def run(self, connection, request):
+        import traceback
+        if request.get('version') != BLIHBETTER_VERSION:
+            return agent_send(connection, b'v')
+        with self.lock:
+            self.requests += 1
+            stdout, stderr, cwd, columns = sys.stdout, sys.stderr, os.getcwd(), os.environ.get('COLUMNS')
+            cache = get_cache()
+            flags = (cache.read, cache.write)
+            code = 0
+            try:
+                cache.sync()
+                get_audit_store().sync()
+                os.chdir(request['cwd'])
+                if request['columns']:
+                    os.environ['COLUMNS'] = str(request['columns'])
+                sys.stdout = AgentStream(connection, b'o', request['tty'])
+                sys.stderr = AgentStream(connection, b'e')
+                try:
+                    main(list(request['argv']))
+                except SystemExit as e:
+                    if e.code is not None and not isinstance(e.code, int):
+                        print(e.code, file=sys.stderr)
+                    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+                if columns is None:
+                    os.environ.pop('COLUMNS', None)
+                else:
+                    os.environ['COLUMNS'] = columns
+                os.chdir(cwd)
+                cache.read, cache.write = flags
+                cache.save()
+                get_audit_store().save()
+        agent_send(connection, b'x', str(code).encode())
+
+agent = None
+
+def agent_start(detach=True):
+    import signal
+    global agent
+    server = BlihAgent(agent_socket_path())
+    try:
+        server.listen()
+    except OSError as e:
+        print('\033[37;41m ERROR \033[0m Unable to start the agent :', e)
+        sys.exit(1)
+    if detach:
+        pid = os.fork()
+        if pid:
+            print('\033[37;42m OK \033[0m Agent started (pid ' + str(pid) + ') on \'' + server.path + '\'')
+            return
+        os.setsid()
+        null = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(null, fd)
+        os.close(null)
+    else:
+        print('\033[37;44m INFO \033[0m Agent listening on \'' + server.path + '\'', flush=True)
+    agent = server
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+
+def agent_status():
+    import marshal
+    connection = agent_connect()
+    if connection is None:
+        print('\033[37;44m INFO \033[0m No agent is running')
+        sys.exit(1)
+    with connection:
+        agent_send(connection, b's')
+        kind, payload = agent_receive(connection)
+    status = marshal.loads(payload)
+    print('\033[37;42m OK \033[0m Agent v' + status['version'], '(pid ' + str(status['pid']) + ') on \'' + agent_socket_path() + '\'')
+    print('Uptime:  ', int(status['uptime']), 's')
+    print('Requests:', status['requests'])
+
+def agent_stop():
+    connection = agent_connect()
+    if connection is None:
+        print('\033[37;44m INFO \033[0m No agent is running')
+        return
+    with connection:
+        agent_send(connection, b'q')
+        agent_receive(connection)
+    print('\033[37;42m OK \033[0m Agent stopped')
+
+def pop_option(args, names, default=None):
+    for name in names:
+        if name in args[:-1]:
+            i = args.index(name)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+    return default
+
+def pop_flag(args, names):
+    found = False
+    for name in names:
+        while name in args[1:]:
+            args.remove(name)
+            found = True
+    return found
+
 def usage(cmd=None):
     print_logo()
     if cmd in ('acl', 'ACL', 'acls', 'ACLs', 'rights'):
@@ -568,12 +2802,28 @@ def usage(cmd=None):
         print('\033[1;33mCOMMANDS:\033[0m')
         print('    get <repo> <acl>  - Get repository ACLs')
         print('    set <repo> <acl>  - Set repository ACLs')
+        print('    audit <rule>...   - Check the ACLs of every repository against rules', end='\n\n')
+        print('\033[1;33mOPTIONS:\033[0m')
+        print('    --repos <glob|file>  - Apply to every matching repository instead of <repo>')
+        print('    --jobs <n>           - Number of concurrent requests (' + str(DEFAULT_JOBS) + ' by default)')
     elif cmd == 'getacl':
-        print('\033[1;33mUSAGE:\033[0m blihbetter get acl <repo>', end='\n\n')
+        print('\033[1;33mUSAGE:\033[0m blihbetter get acl <repo>', end='\n')
+        print('       blihbetter get acl --repos <glob|file> [--jobs <n>]', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Get the repository ACLs')
     elif cmd == 'setacl':
-        print('\033[1;33mUSAGE:\033[0m blihbetter set acl <repo> <user> <acl>', end='\n\n')
+        print('\033[1;33mUSAGE:\033[0m blihbetter set acl <repo> <user> <acl>', end='\n')
+        print('       blihbetter set acl --repos <glob|file> <user> <acl> [--jobs <n>]', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Set the repository ACLs')
+    elif cmd == 'auditacl':
+        print('\033[1;33mUSAGE:\033[0m blihbetter acl audit <rule>... [--repos <glob|file>] [--full] [--json] [--jobs <n>]', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Report the repositories whose ACLs break a rule.')
+        print('             The ACLs are fetched concurrently and remembered, so the next audit only')
+        print('             fetches the repositories created, changed by blihbetter or checked more than a day ago.')
+        print('             --full fetches every repository again, --json prints the report as JSON.', end='\n\n')
+        print('\033[1;33mRULES:\033[0m')
+        print('    <user>:<acl>       - <user> must have at least <acl>')
+        print('    !<user>:<acl>      - <user> (a glob) must not have any of <acl>')
+        print('    <acl>=<user>,...   - Only these users (globs) may have any of <acl>')
     elif cmd == 'config':
         print('\033[1;33mUSAGE:\033[0m blihbetter config (<output file>/info)', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m')
@@ -581,29 +2831,86 @@ def usage(cmd=None):
         print('    <output file>:  - Create a config in the <output file>.')
         print('                      The <output file> is \033[2m\'' + DEFAULT_CONFIG_FILE + '\'\033[0m by default.')
     elif cmd == 'clone':
-        print('\033[1;33mUSAGE:\033[0m blihbetter clone <repo>', end='\n\n')
+        print('\033[1;33mUSAGE:\033[0m blihbetter clone <repo>', end='\n')
+        print('       blihbetter clone (<glob>/--all/--from-file <file>) [--jobs <n>] [--shared]', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Clone the defined repository <repo>.')
+        print('             With a glob, --all or --from-file, clone every matching repository concurrently.')
+        print('             Repositories that already exist in the current directory are skipped.')
+        print('             --shared downloads and stores the objects common to many repositories only once,')
+        print('             in \'' + DEFAULT_OBJECT_STORE + '\'.')
+    elif cmd == 'sync':
+        print('\033[1;33mUSAGE:\033[0m blihbetter sync [<dir>] [--jobs <n>]', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Update the clones of your repositories found in <dir> (the current directory by default).')
+        print('             The remote branches and tags of every clone are checked concurrently over one ssh connection,')
+        print('             and only the clones whose remote changed since the last sync are pulled (fast-forward only).')
     elif cmd == 'ls':
-        print('\033[1;33mUSAGE:\033[0m blihbetter ls', end='\n\n')
+        print('\033[1;33mUSAGE:\033[0m blihbetter ls [--long] [--sort <key>] [--jobs <n>]', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m List every repository of the user.')
+        print('             --long fetches the informations and ACLs of every repository concurrently.')
+        print('             Rows are printed as they arrive, or sorted by --sort (' + '/'.join(LS_SORT_KEYS) + ', prefix with - to reverse).')
     elif cmd == 'create':
         print('\033[1;33mUSAGE:\033[0m blihbetter create <repo>', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Create a new repository <repo>.')
     elif cmd == 'new':
-        print('\033[1;33mUSAGE:\033[0m blihbetter new <repo>', end='\n\n')
+        print('\033[1;33mUSAGE:\033[0m blihbetter new <repo>', end='\n')
+        print('       blihbetter new <repo>... [--from-file <file>] [--jobs <n>]', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Create a new repository <repo> with the default Epitech configuration.')
+        print('             With many names, repositories are created and get their ACLs concurrently,')
+        print('             and each one is cloned as soon as it is ready. Failures are reported per step.')
     elif cmd == 'rm':
         print('\033[1;33mUSAGE:\033[0m blihbetter rm <repo>', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Remove a repository <repo>.')
     elif cmd == 'info':
         print('\033[1;33mUSAGE:\033[0m blihbetter info <repo>', end='\n\n')
         print('\033[1;33mDESCRIPTION:\033[0m Display repository informations.')
+    elif cmd == 'apply':
+        print('\033[1;33mUSAGE:\033[0m blihbetter apply <manifest> [--plan] [--prune] [--jobs <n>]', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Create repositories and set ACLs to match the <manifest> file.')
+        print('             Only the requests needed to reach the described state are sent, concurrently.')
+        print('             --plan prints the changes without applying them.')
+        print('             --prune also deletes the repositories missing from the manifest.', end='\n\n')
+        print('\033[1;33mMANIFEST:\033[0m')
+        print('    {"repositories": {"<repo>": {"description": "...", "acls": {"ramassage-tek": "r"}}}}')
+    elif cmd == 'agent':
+        print('\033[1;33mUSAGE:\033[0m blihbetter agent [command]', end='\n\n')
+        print('\033[1;33mCOMMANDS:\033[0m')
+        print('    start              - Start the agent in the background')
+        print('    run                - Run the agent in the foreground')
+        print('    stop               - Stop the agent')
+        print('    status             - Show whether the agent is running', end='\n\n')
+        print('The agent keeps connections, cached data and the config in memory and')
+        print('serves repository and ACL commands sent over \'' + agent_socket_path() + '\'.')
+        print('Set ' + AGENT_ENVIRONMENT + '=0 to bypass it or to a path to use another socket.')
+    elif cmd == 'flush':
+        print('\033[1;33mUSAGE:\033[0m blihbetter flush [--plan] [--jobs <n>]', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Send the operations queued while blih was unreachable (see --queue), in order.')
+        print('             Successive ACL changes of a same user on a same repository are merged into the last one,')
+        print('             and the operations of different repositories are sent concurrently.')
+        print('             --plan only lists the queued operations.')
+    elif cmd == 'snapshot':
+        print('\033[1;33mUSAGE:\033[0m blihbetter snapshot [<file>] [--jobs <n>]', end='\n')
+        print('       blihbetter snapshot diff <old file> <new file>', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Save every repository, its informations and ACLs and your ssh keys to <file>')
+        print('             (snapshot-<date>.jsonl.gz by default), fetching them concurrently.')
+        print('             diff lists what changed between two snapshots and exits with 1 when something did.')
+    elif cmd == 'completion':
+        print('\033[1;33mUSAGE:\033[0m blihbetter completion (' + '/'.join(COMPLETION_SHELLS) + ')', end='\n')
+        print('       blihbetter completion refresh', end='\n\n')
+        print('\033[1;33mDESCRIPTION:\033[0m Print the completion script of a shell, e.g. eval "$(blihbetter completion bash)".')
+        print('             Repository, user and ssh key names are completed from \'' + DEFAULT_NAMES_FILE + '\',')
+        print('             refreshed in the background when older than ' + str(NAMES_MAX_AGE // 60) + ' minutes or after a change.')
+        print('             refresh fetches the names now.')
     elif cmd == 'sshkey':
         print('\033[1;33mUSAGE:\033[0m blihbetter ' + cmd + ' [command] arguments...', end='\n\n')
         print('\033[1;33mCOMMANDS:\033[0m')
         print('    list               - List ssh keys')
         print('    upload <filename>  - Upload ssh key from a file')
         print('    rm <key name>      - Set repository ACLs')
+        print('    sync <directory>   - Upload the keys of the .pub files missing from blih', end='\n\n')
+        print('\033[1;33mOPTIONS:\033[0m')
+        print('    --prune            - Also remove the keys missing from the directory')
+        print('    --plan             - Only print the changes')
+        print('    --jobs <n>         - Number of concurrent requests (' + str(DEFAULT_JOBS) + ' by default)')
     else:
         print('\033[0;32mv' + BLIHBETTER_VERSION + '\033[0m', end='\n\n')
         print('\033[1;33mUSAGE:\033[0m blihbetter [command] arguments...', end='\n\n')
@@ -616,119 +2923,592 @@ def usage(cmd=None):
         print('    create <name>      - Create a new repository')
         print('    new <name>         - Create a new repository with default Epitech config')
         print('    clone <name>       - Clone the repository')
+        print('    sync [<dir>]       - Update the clones found in a directory')
+        print('    snapshot [<file>]  - Save the state of the account to compare it later')
+        print('    flush              - Send the operations queued while blih was unreachable')
         print('    rm <name>          - Remove the repository')
         print('    info <name>        - Display repository informations')
-        print('    acl (get/set)      - Edit the repository ACLs')
+        print('    acl (get/set)      - Edit or audit the repository ACLs')
+        print('    apply <manifest>   - Make repositories and ACLs match a manifest')
         print('    sshkey (add/ls/rm) - Edit the repository ACLs')
+        print('    agent (start/stop) - Serve commands from a background process')
+        print('    completion <shell> - Print the bash/zsh/fish completion script', end='\n\n')
+        print('\033[1;33mOPTIONS:\033[0m')
+        print('    --no-cache         - Do not read nor store cached repository data')
+        print('    --refresh          - Ignore cached repository data and fetch it again')
+        print('    --queue            - Queue changes while blih is unreachable (see flush)')
+        print('    --trace            - Print request and subprocess timings at exit')
+        print('    --trace-file <f>   - Also write them to <f> in the Chrome trace format')
         print('\n\033[2m© Louis Kleiver (louis.kleiver@gmail.com)\033[0m')
 
-if __name__ == "__main__":
-    if len(sys.argv) == 1:
+def parse_options(args):
+    options = {}
+    for name, flags, has_value in OPTIONS:
+        options[name] = pop_option(args, flags) if has_value else pop_flag(args, flags)
+    try:
+        options['jobs'] = int(options['jobs']) if options['jobs'] else None
+    except ValueError:
+        print('\033[37;41m ERROR \033[0m Invalid number of jobs', options['jobs'])
+        sys.exit(1)
+    return options
+
+def find_command(words):
+    words = list(words)
+    if len(words) > 1 and words[0] in ('get', 'set') and words[1] in ACL_ALIASES:
+        words[0:2] = ['acl', words[0]]
+    words[0:1] = COMMAND_ALIASES.get(words[0], [words[0]])
+    if len(words) > 1:
+        words[1] = SUBCOMMAND_ALIASES.get(words[0], {}).get(words[1], words[1])
+        if (words[0], words[1]) in COMMANDS:
+            return ((words[0], words[1]), words[2:])
+    if words[0] in COMMANDS:
+        return (words[0], words[1:])
+    return (None, words)
+
+def command_config(user_config, args, options):
+    if args == ['info']:
+        user_config_info(get_user_config())
+    else:
+        set_user_config(*args)
+
+def command_whoami(user_config, args, options):
+    print_logo()
+    print('\n\033[1;33mHello\033[1;37m', user_config[USER_IDENTIFIER], '\033[0m')
+    print('\033[2mYou can type \'blihbetter config info\' to get more informations\033[0m')
+
+def command_ls(user_config, args, options):
+    if options['long'] or options['sort']:
+        if ls_long(user_config, sort=options['sort'], jobs=options['jobs']):
+            sys.exit(1)
+    else:
+        ls(user_config)
+
+def command_clone(user_config, args, options):
+    if options['all'] or options['from_file'] or options['repos'] or (args and is_pattern(args[0])):
+        if args and (options['all'] or options['from_file'] or options['repos']):
+            return usage('clone')
+        if clone_many(user_config, expand_repositories(user_config, '*' if options['all'] else (options['from_file'] or options['repos'] or args[0]), from_file=bool(options['from_file'])), jobs=options['jobs'], shared=options['shared']):
+            sys.exit(1)
+    elif args:
+        clone(user_config, args[0], shared=options['shared'])
+    else:
+        usage('clone')
+
+def command_sync(user_config, args, options):
+    if sync(user_config, args[0] if args else '.', jobs=options['jobs']):
+        sys.exit(1)
+
+def command_new(user_config, args, options):
+    if options['from_file'] or len(args) > 1:
+        repositories = list(args)
+        if options['from_file']:
+            try:
+                with open(options['from_file'], 'r') as file:
+                    repositories += [line.strip() for line in file if line.strip() and not line.startswith('#')]
+            except OSError:
+                print('\033[37;41m ERROR \033[0m Can\'t open file : ' + options['from_file'])
+                sys.exit(1)
+        if new_many(user_config, list(dict.fromkeys(repositories)), jobs=options['jobs']):
+            sys.exit(1)
+    elif args:
+        create(user_config, args[0])
+        set_acl(user_config, args[0], 'ramassage-tek', 'r')
+        clone(user_config, args[0])
+    else:
+        usage('new')
+
+def command_apply(user_config, args, options):
+    if apply_manifest(user_config, args[0], plan_only=options['plan'], prune=options['prune'], jobs=options['jobs']):
+        sys.exit(1)
+
+def snapshot_capture(user_config, jobs=None):
+    import asyncio
+    client = get_client(user_config)
+    repositories = blih_request(client.repositories)
+    sshkeys = blih_request(client.sshkeys)
+    progress = sys.stdout.isatty() and len(repositories) > 0
+    done = [0]
+    async def fetch(semaphore, name):
+        async with semaphore:
+            repository, acls = await asyncio.gather(client.client.repository(name), client.client.acls(name))
+        done[0] += 1
+        if progress:
+            print('\r\033[K\033[2m[' + str(done[0]) + '/' + str(len(repositories)) + '] ' + name + '\033[0m', end='', flush=True)
+        record = {'type': 'repository', 'name': name, 'acls': {acl.user: acl.rights for acl in acls if acl.rights}}
+        for field in SNAPSHOT_FIELDS:
+            record[field] = getattr(repository, field)
+        return record
+    async def fetch_all():
+        semaphore = asyncio.Semaphore(max(1, jobs or DEFAULT_JOBS))
+        return await asyncio.gather(*(fetch(semaphore, repo.name) for repo in repositories))
+    try:
+        records = blih_request(client.run, fetch_all())
+    finally:
+        if progress:
+            print('\r\033[K', end='')
+    records += [{'type': 'sshkey', 'name': sshkey.name, 'fingerprint': ssh_key_fingerprint(sshkey.key), 'key': sshkey.key} for sshkey in sshkeys]
+    return sorted(records, key=lambda record: (record['type'], record['name']))
+
+def snapshot(user_config, path=None, jobs=None):
+    import gzip
+    import json
+    if not path:
+        path = 'snapshot-' + time.strftime('%Y%m%d-%H%M%S') + '.jsonl.gz'
+    records = snapshot_capture(user_config, jobs=jobs)
+    header = {'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION, 'user': user_config[USER_IDENTIFIER], 'time': int(time.time())}
+    try:
+        with gzip.open(path + '.tmp', 'wt', encoding='utf8') as file:
+            for record in [header] + records:
+                file.write(json.dumps(record, sort_keys=True, separators=(',', ':')) + '\n')
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        print('\033[37;41m ERROR \033[0m Can\'t write snapshot \'' + path + '\' : ' + e.strerror)
+        sys.exit(1)
+    repositories = len([record for record in records if record['type'] == 'repository'])
+    print('\033[37;42m OK \033[0m\033[1m', path, '\033[0m', repositories, 'repositories and', len(records) - repositories, 'ssh keys')
+
+def snapshot_lines(path):
+    import io
+    import gzip
+    import json
+    try:
+        with open(path, 'rb') as raw:
+            compressed = raw.read(2) == b'\x1f\x8b'
+            raw.seek(0)
+            file = io.TextIOWrapper(gzip.GzipFile(fileobj=raw) if compressed else raw, encoding='utf8')
+            header = json.loads(file.readline() or 'null')
+            if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+                raise ValueError('Not a snapshot')
+            if header.get('version') != SNAPSHOT_VERSION:
+                raise ValueError('Unsupported snapshot version ' + str(header.get('version')))
+            yield header
+            yield from file
+    except (OSError, EOFError, ValueError) as e:
+        print('\033[37;41m ERROR \033[0m Can\'t read snapshot \'' + path + '\' : ' + (e.strerror if isinstance(e, OSError) and e.strerror else str(e)))
+        sys.exit(1)
+
+def snapshot_record(path, line):
+    import json
+    try:
+        record = json.loads(line)
+        return ((record['type'], record['name']), record)
+    except (ValueError, KeyError, TypeError):
+        print('\033[37;41m ERROR \033[0m Can\'t read snapshot \'' + path + '\' : Invalid record ' + line.strip()[:80])
+        sys.exit(1)
+
+def snapshot_changes(old, new):
+    if old is None:
+        yield ('+', new['type'], new['name'], new.get('fingerprint'))
+        old = {'acls': {}}
+    elif new is None:
+        yield ('-', old['type'], old['name'], old.get('fingerprint'))
+        return
+    if new['type'] == 'sshkey':
+        if 'type' in old and old['fingerprint'] != new['fingerprint']:
+            yield ('~', 'sshkey', new['name'], (old['fingerprint'] or '-') + ' -> ' + (new['fingerprint'] or '-'))
+        return
+    if 'type' in old and old['uuid'] != new['uuid']:
+        yield ('~', 'repository', new['name'], 'recreated')
+    elif 'type' in old:
+        for field in SNAPSHOT_FIELDS[1:]:
+            if old[field] != new[field]:
+                yield ('~', 'repository', new['name'], field + ': ' + repr(old[field]) + ' -> ' + repr(new[field]))
+    for user in sorted(set(old['acls']) | set(new['acls'])):
+        if set(old['acls'].get(user, '')) != set(new['acls'].get(user, '')):
+            yield ('~', 'acl', new['name'], user + ': ' + (old['acls'].get(user) or '-') + ' -> ' + (new['acls'].get(user) or '-'))
+
+def snapshot_diff(old_path, new_path):
+    import datetime
+    colors = {'+': '\033[32m', '-': '\033[31m', '~': '\033[33m'}
+    counts = {}
+    old_lines = snapshot_lines(old_path)
+    new_lines = snapshot_lines(new_path)
+    for path, header in ((old_path, next(old_lines)), (new_path, next(new_lines))):
+        print('\033[37;44m INFO \033[0m', path + ':', header.get('user'), datetime.datetime.fromtimestamp(header.get('time', 0)).strftime('%Y-%m-%d %H:%M:%S'))
+    print()
+    old_line = next(old_lines, None)
+    new_line = next(new_lines, None)
+    old = new = None
+    while old_line is not None or new_line is not None:
+        # Records are written with sorted keys, so an unchanged record is the same line in both snapshots
+        if old_line == new_line:
+            old_line, old = next(old_lines, None), None
+            new_line, new = next(new_lines, None), None
+            continue
+        old = snapshot_record(old_path, old_line) if old is None and old_line is not None else old
+        new = snapshot_record(new_path, new_line) if new is None and new_line is not None else new
+        if new is None or (old is not None and old[0] < new[0]):
+            changes = list(snapshot_changes(old[1], None))
+            old_line, old = next(old_lines, None), None
+        elif old is None or new[0] < old[0]:
+            changes = list(snapshot_changes(None, new[1]))
+            new_line, new = next(new_lines, None), None
+        else:
+            changes = list(snapshot_changes(old[1], new[1]))
+            old_line, old = next(old_lines, None), None
+            new_line, new = next(new_lines, None), None
+        for sign, kind, name, detail in changes:
+            counts[(sign, kind)] = counts.get((sign, kind), 0) + 1
+            print(colors[sign] + sign + ' ' + kind.ljust(10) + '\033[0m', name, *([detail if sign == '~' else '\033[2m' + detail + '\033[0m'] if detail else []))
+    if counts:
+        print()
+    print('\033[37;44m INFO \033[0m', counts.get(('+', 'repository'), 0), 'repositories created,', counts.get(('-', 'repository'), 0), 'removed,', counts.get(('~', 'repository'), 0), 'changed,', counts.get(('~', 'acl'), 0), 'ACL changes,', sum(count for (sign, kind), count in counts.items() if kind == 'sshkey'), 'ssh key changes')
+    return bool(counts)
+
+def coalesce_operations(entries):
+    latest = {}
+    for index, entry in entries:
+        if entry['operation'] == 'set_acl':
+            latest[tuple(entry['args'][:2])] = index
+    merged = {}
+    operations = []
+    for index, entry in entries:
+        if entry['operation'] == 'set_acl':
+            key = tuple(entry['args'][:2])
+            merged.setdefault(key, []).append(index)
+            if latest[key] != index:
+                continue
+            operations.append((merged.pop(key), entry['operation'], entry['args']))
+        else:
+            operations.append(([index], entry['operation'], entry['args']))
+    return operations
+
+def flush(user_config, plan_only=False, jobs=None):
+    queue = get_queue()
+    with queue.lock():
+        entries = queue.read()
+        owned = [(index, entry) for index, (line, entry) in enumerate(entries) if queue.owned(user_config, entry)]
+        failures = []
+        rejected = set()
+        for index, entry in owned:
+            if not queue.valid(user_config, entry):
+                failures.append(str(index + 1))
+                rejected.add(index)
+                print('\033[37;41m ERROR \033[0m\033[1m', 'operation ' + str(index + 1), '\033[0m', 'Invalid signature, ' + ('will be moved' if plan_only else 'moved') + ' to \'' + queue.path + '.rejected\'')
+        if rejected and not plan_only:
+            queue.reject([line for index, (line, entry) in enumerate(entries) if index in rejected])
+            queue.rewrite([line for index, (line, entry) in enumerate(entries) if index not in rejected])
+            entries = [(line, entry) for index, (line, entry) in enumerate(entries) if index not in rejected]
+            owned = [(index, entry) for index, (line, entry) in enumerate(entries) if queue.owned(user_config, entry)]
+        operations = coalesce_operations([(index, entry) for index, entry in owned if queue.valid(user_config, entry)])
+        for indexes, operation, args in operations:
+            print('\033[33m~ ' + QUEUE_OPERATIONS[operation].ljust(13) + '\033[0m', describe_operation(operation, args)[len(QUEUE_OPERATIONS[operation]) + 1:], *(['\033[2m(' + str(len(indexes) - 1) + ' merged)\033[0m'] if len(indexes) > 1 else []))
+        if operations:
+            print()
+        print('\033[37;44m INFO \033[0m', len(operations), 'operations to replay,', sum(len(indexes) for indexes, operation, args in operations) - len(operations), 'merged')
+        if plan_only or not operations:
+            return failures
+        print()
+        chains = {}
+        for operation in operations:
+            chains.setdefault('ssh keys' if 'sshkey' in operation[1] else operation[2][0], []).append(operation)
+        client = get_client(user_config)
+        done = set()
+        def replay(label):
+            messages = []
+            error = None
+            for indexes, operation, args in chains[label]:
+                try:
+                    messages.append(getattr(client, operation)(*args))
+                except BlihError as e:
+                    if e.code in QUEUE_CODES:
+                        raise
+                    error = error or BlihError(e.code, describe_operation(operation, args) + ' : ' + str(e.message))
+                done.update(indexes)
+            if error:
+                raise error
+            return messages[0] if len(messages) == 1 else str(len(messages)) + ' operations replayed'
+        failures += run_bulk(list(chains), replay, jobs=jobs)
+        queue.rewrite([line for index, (line, entry) in enumerate(entries) if index not in done])
+    return failures
+
+def invalidate_names(path=DEFAULT_NAMES_FILE):
+    try:
+        os.utime(path, (0, 0))
+        os.unlink(path + '.refresh')
+    except OSError:
+        pass
+
+def write_names(names, path=DEFAULT_NAMES_FILE):
+    import marshal
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as file:
+            marshal.dump({kind: sorted(set(values)) for kind, values in names.items()}, file)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+def refresh_names(user_config):
+    client = get_client(user_config)
+    users = {'ramassage-tek'}
+    for scanned in get_audit_store().account(user_config).values():
+        users.update(scanned['acls'])
+    cache = get_cache()
+    prefix = cache.key(user_config, '/repository/')
+    with cache.lock:
+        for key, entry in cache.load().items():
+            if key.startswith(prefix) and key.endswith('/acls'):
+                users.update(entry['data'])
+    names = {
+        'repositories': [repo.name for repo in blih_request(client.repositories)],
+        'users': users,
+        'sshkeys': [key.name for key in blih_request(client.sshkeys)]
+    }
+    write_names(names)
+    return names
+
+def completion_program():
+    import json
+    top = sorted(name for name in COMMANDS if isinstance(name, str))
+    subcommands = {}
+    arguments = {}
+    for name, (handler, needs_config, page, minimum, maximum) in COMMANDS.items():
+        if not isinstance(name, str):
+            subcommands.setdefault(name[0], []).append(name[1])
+        if name in COMPLETIONS:
+            arguments[name if isinstance(name, str) else ' '.join(name)] = (COMPLETIONS[name], maximum)
+    flags = sorted(flag for name, option_flags, has_value in OPTIONS for flag in option_flags)
+    values = {flag: OPTION_COMPLETIONS.get(name, ()) for name, option_flags, has_value in OPTIONS if has_value for flag in option_flags}
+    library = json.dumps(os.path.dirname(os.path.abspath(__file__)))
+    tables = json.dumps({
+        'commands': (top, {name: sorted(subs) for name, subs in subcommands.items()}, arguments),
+        'aliases': (COMMAND_ALIASES, SUBCOMMAND_ALIASES, ACL_ALIASES),
+        'options': (flags, values),
+        'path': DEFAULT_NAMES_FILE,
+        'max_age': NAMES_MAX_AGE,
+        'delay': NAMES_REFRESH_DELAY,
+        'refresh': [sys.executable, '-c', 'import sys; sys.path.insert(0, ' + library + '); from blihbetter import main; main(["blihbetter", "completion", "refresh"])']
+    })
+    return 'import sys; sys.path.insert(0, ' + library + '); from blihbetter_completion import main; main(' + tables + ', sys.argv)'
+
+def completion_script(shell):
+    import shlex
+    program = completion_program()
+    if shell == 'fish':
+        quote = lambda text: '\'' + text.replace('\\', '\\\\').replace('\'', '\\\'') + '\''
+        return '\n'.join([
+            'function __blihbetter_complete',
+            '    set -l words (commandline -opc)',
+            '    set -l current (commandline -ct)',
+            '    set -e words[1]',
+            '    ' + quote(sys.executable) + ' -S -E -c ' + quote(program) + ' $words "$current" 2>/dev/null',
+            '    switch $status',
+            '        case 1',
+            '            __fish_complete_path "$current"',
+            '        case 2',
+            '            __fish_complete_directories "$current"',
+            '    end',
+            'end',
+            'complete -c blihbetter -f -a \'(__blihbetter_complete)\''
+        ])
+    command = shlex.quote(sys.executable) + ' -S -E -c ' + shlex.quote(program)
+    if shell == 'zsh':
+        return '\n'.join([
+            '_blihbetter() {',
+            '    local output code',
+            '    local -a candidates',
+            '    output=$(' + command + ' "${(@)words[2,CURRENT]}" 2>/dev/null)',
+            '    code=$?',
+            '    candidates=(${(f)output})',
+            '    compadd -a candidates',
+            '    if (( code == 1 )); then',
+            '        _files',
+            '    elif (( code == 2 )); then',
+            '        _files -/',
+            '    fi',
+            '}',
+            'compdef _blihbetter blihbetter'
+        ])
+    return '\n'.join([
+        '_blihbetter() {',
+        '    local IFS=$\'\\n\' candidates code',
+        '    candidates=$(' + command + ' "${COMP_WORDS[@]:1:COMP_CWORD}" 2>/dev/null)',
+        '    code=$?',
+        '    COMPREPLY=($candidates)',
+        '    if [ $code -eq 1 ]; then',
+        '        compopt -o filenames 2>/dev/null',
+        '        COMPREPLY+=($(compgen -f -- "${COMP_WORDS[COMP_CWORD]}"))',
+        '    elif [ $code -eq 2 ]; then',
+        '        compopt -o filenames 2>/dev/null',
+        '        COMPREPLY+=($(compgen -d -- "${COMP_WORDS[COMP_CWORD]}"))',
+        '    fi',
+        '}',
+        'complete -F _blihbetter blihbetter'
+    ])
+
+def command_sshkey_sync(user_config, args, options):
+    get_cache().read = False
+    if sshkey_sync(user_config, args[0], prune=options['prune'], plan_only=options['plan'], jobs=options['jobs']):
+        sys.exit(1)
+
+def command_snapshot(user_config, args, options):
+    get_cache().read = False
+    snapshot(user_config, args[0] if args else None, jobs=options['jobs'])
+
+def command_snapshot_diff(user_config, args, options):
+    if snapshot_diff(*args):
+        sys.exit(1)
+
+def command_flush(user_config, args, options):
+    if flush(user_config, plan_only=options['plan'], jobs=options['jobs']):
+        sys.exit(1)
+
+def command_completion(user_config, args, options):
+    if args[0] not in COMPLETION_SHELLS:
+        return usage('completion')
+    print(completion_script(args[0]))
+
+def command_completion_refresh(user_config, args, options):
+    names = refresh_names(user_config)
+    print('\033[37;44m INFO \033[0m', len(names['repositories']), 'repositories,', len(names['users']), 'users and', len(names['sshkeys']), 'ssh keys cached for completion')
+
+def command_acl_get(user_config, args, options):
+    if options['repos'] and not args:
+        bulk_get_acl(user_config, options['repos'], jobs=options['jobs'])
+    elif not options['repos'] and len(args) == 1:
+        get_acl(user_config, args[0])
+    else:
+        usage('getacl')
+
+def command_acl_audit(user_config, args, options):
+    if options['full']:
+        get_cache().read = False
+    if acl_audit(user_config, args, pattern=options['repos'], full=options['full'], as_json=options['json'], jobs=options['jobs']):
+        sys.exit(1)
+
+def command_acl_set(user_config, args, options):
+    if options['repos'] and len(args) in (1, 2):
+        bulk_set_acl(user_config, options['repos'], *args, jobs=options['jobs'])
+    elif not options['repos'] and len(args) in (2, 3):
+        set_acl(user_config, *args)
+    else:
+        usage('setacl')
+
+ACL_ALIASES = ('acl', 'ACL', 'acls', 'ACLs', 'rights')
+COMMAND_ALIASES = {
+    'list': ['ls'],
+    'delete': ['rm'],
+    'remove': ['rm'],
+    'getacl': ['acl', 'get'],
+    'setacl': ['acl', 'set'],
+    'ACL': ['acl'],
+    'acls': ['acl'],
+    'ACLs': ['acl'],
+    'rights': ['acl']
+}
+SUBCOMMAND_ALIASES = {
+    'sshkey': {'ls': 'list', 'add': 'upload', 'remove': 'rm', 'delete': 'rm'}
+}
+OPTIONS = (
+    ('trace_file', ('--trace-file',), True),
+    ('trace', ('--trace',), False),
+    ('no_cache', ('--no-cache',), False),
+    ('refresh', ('--refresh',), False),
+    ('jobs', ('-j', '--jobs'), True),
+    ('repos', ('--repos',), True),
+    ('from_file', ('--from-file',), True),
+    ('all', ('--all',), False),
+    ('long', ('-l', '--long'), False),
+    ('sort', ('--sort',), True),
+    ('plan', ('--plan',), False),
+    ('prune', ('--prune',), False),
+    ('full', ('--full',), False),
+    ('shared', ('--shared',), False),
+    ('json', ('--json',), False),
+    ('queue', ('--queue',), False)
+)
+# name: (handler, needs config, usage page, minimum arguments, maximum arguments)
+COMMANDS = {
+    'help': (lambda user_config, args, options: usage(args[0] if args else None), False, None, 0, 1),
+    'config': (command_config, False, 'config', 0, 1),
+    'whoami': (command_whoami, True, None, 0, 0),
+    'ping': (lambda user_config, args, options: ping(user_config, *args), True, None, 0, 1),
+    'ls': (command_ls, True, 'ls', 0, 0),
+    'clone': (command_clone, True, 'clone', 0, 1),
+    'create': (lambda user_config, args, options: create(user_config, args[0]), True, 'create', 1, 1),
+    'new': (command_new, True, 'new', 0, sys.maxsize),
+    'rm': (lambda user_config, args, options: delete(user_config, args[0]), True, 'rm', 1, 1),
+    'info': (lambda user_config, args, options: info(user_config, args[0]), True, 'info', 1, 1),
+    'apply': (command_apply, True, 'apply', 1, 1),
+    'sync': (command_sync, True, 'sync', 0, 1),
+    'flush': (command_flush, True, 'flush', 0, 0),
+    'snapshot': (command_snapshot, True, 'snapshot', 0, 1),
+    ('snapshot', 'diff'): (command_snapshot_diff, False, 'snapshot', 2, 2),
+    'acl': (lambda user_config, args, options: usage('acl'), False, 'acl', 0, 0),
+    ('acl', 'get'): (command_acl_get, True, 'getacl', 0, 1),
+    ('acl', 'set'): (command_acl_set, True, 'setacl', 1, 3),
+    ('acl', 'audit'): (command_acl_audit, True, 'auditacl', 1, sys.maxsize),
+    'sshkey': (lambda user_config, args, options: usage('sshkey'), False, 'sshkey', 0, 0),
+    ('sshkey', 'list'): (lambda user_config, args, options: sshkey_list(user_config), True, 'sshkey', 0, 0),
+    ('sshkey', 'upload'): (lambda user_config, args, options: sshkey_upload(user_config, args[0]), True, 'sshkey', 1, 1),
+    ('sshkey', 'rm'): (lambda user_config, args, options: sshkey_remove(user_config, args[0]), True, 'sshkey', 1, 1),
+    ('sshkey', 'sync'): (command_sshkey_sync, True, 'sshkey', 1, 1),
+    'agent': (lambda user_config, args, options: usage('agent'), False, 'agent', 0, 0),
+    ('agent', 'start'): (lambda user_config, args, options: agent_start(), False, 'agent', 0, 0),
+    ('agent', 'run'): (lambda user_config, args, options: agent_start(detach=False), False, 'agent', 0, 0),
+    ('agent', 'stop'): (lambda user_config, args, options: agent_stop(), False, 'agent', 0, 0),
+    ('agent', 'status'): (lambda user_config, args, options: agent_status(), False, 'agent', 0, 0),
+    'completion': (command_completion, False, 'completion', 1, 1),
+    ('completion', 'refresh'): (command_completion_refresh, True, 'completion', 0, 0)
+}
+AGENT_COMMANDS = ('whoami', 'ls', 'create', 'rm', 'info', 'apply', 'snapshot', 'flush', ('acl', 'get'), ('acl', 'set'), ('acl', 'audit'), ('sshkey', 'list'), ('sshkey', 'upload'), ('sshkey', 'rm'), ('sshkey', 'sync'), ('completion', 'refresh'))
+# name: completion of each argument, the last one repeating: a word list, a name store list, 'files', 'directories' or 'commands'
+COMPLETIONS = {
+    'help': ('commands',),
+    'config': (('info',),),
+    'clone': ('repositories',),
+    'rm': ('repositories',),
+    'info': ('repositories',),
+    'apply': ('files',),
+    'sync': ('directories',),
+    'snapshot': ('files',),
+    ('snapshot', 'diff'): ('files',),
+    ('acl', 'get'): ('repositories',),
+    ('acl', 'set'): ('repositories', 'users', ('r', 'w', 'a', 'rw', 'ra', 'wa', 'rwa')),
+    ('sshkey', 'upload'): ('files',),
+    ('sshkey', 'rm'): ('sshkeys',),
+    ('sshkey', 'sync'): ('directories',),
+    'completion': (COMPLETION_SHELLS,)
+}
+OPTION_COMPLETIONS = {
+    'trace_file': 'files',
+    'repos': 'repositories',
+    'from_file': 'files',
+    'sort': LS_SORT_KEYS + tuple('-' + key for key in LS_SORT_KEYS)
+}
+
+def main(argv):
+    global queue_writes
+    forwarded = list(argv)
+    options = parse_options(argv)
+    queue_writes = options['queue']
+    if options['trace'] or options['trace_file']:
+        enable_trace(options['trace_file'])
+    elif os.environ.get(TRACE_ENVIRONMENT, '') not in ('', '0'):
+        enable_trace(os.environ[TRACE_ENVIRONMENT] if os.environ[TRACE_ENVIRONMENT] != '1' else None)
+    if options['no_cache']:
+        get_cache().read = False
+        get_cache().write = False
+    if options['refresh']:
+        get_cache().read = False
+    if len(argv) == 1:
         if not os.path.exists(DEFAULT_CONFIG_FILE):
             set_user_config()
         else:
             gui(get_user_config())
-        exit(0)
-    if not (len(sys.argv) == 2 and sys.argv[1] == 'config'):
-        user_config = get_user_config()
-    if len(sys.argv) == 2:
-        if sys.argv[1] == 'help':
-            usage()
-        elif sys.argv[1] == 'ping':
-            ping(user_config)
-        elif sys.argv[1] == 'clone' or sys.argv[1] == 'new' or sys.argv[1] == 'create' or sys.argv[1] == 'info':
-            usage(sys.argv[1])
-        elif sys.argv[1] == 'rm' or sys.argv[1] == 'delete' or sys.argv[1] == 'remove':
-            usage('rm')
-        elif sys.argv[1] == 'ls' or sys.argv[1] == 'list':
-            ls(user_config)
-        elif sys.argv[1] == 'config':
-            set_user_config()
-        elif sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights'):
-            usage('acl')
-        elif sys.argv[1] == 'whoami':
-            print_logo()
-            print('\n\033[1;33mHello\033[1;37m', user_config[USER_IDENTIFIER], '\033[0m')
-            print('\033[2mYou can type \'blihbetter config info\' to get more informations\033[0m')
-        else:
-            usage()
-    elif len(sys.argv) == 3:
-        if sys.argv[1] == 'help':
-            usage(sys.argv[2])
-        elif sys.argv[1] == 'ping':
-            ping(user_config, to=sys.argv[2])
-        elif sys.argv[1] == 'clone':
-            if sys.argv[2] == 'help':
-                usage('clone')
-            else:
-                clone(user_config, sys.argv[2])
-        elif sys.argv[1] == 'sshkey' and (sys.argv[2] == 'ls' or sys.argv[2] == 'list'):
-            sshkey_list(user_config)
-        elif (sys.argv[1] == 'ls' or sys.argv[1] == 'list') and sys.argv[2] == 'help':
-            usage('ls')
-        elif sys.argv[1] == 'create':
-            if sys.argv[2] == 'help':
-                usage('create')
-            else:
-                create(user_config, sys.argv[2])
-        elif sys.argv[1] == 'new':
-            if sys.argv[2] == 'help':
-                usage('new')
-            else:
-                create(user_config, sys.argv[2])
-                set_acl(user_config, sys.argv[2], 'ramassage-tek', 'r')
-                clone(user_config, sys.argv[2])
-        elif sys.argv[1] == 'rm' or sys.argv[1] == 'delete' or sys.argv[1] == 'remove':
-            if sys.argv[2] == 'help':
-                usage('rm')
-            else:
-                delete(user_config, sys.argv[2])
-        elif sys.argv[1] == 'info':
-            if sys.argv[2] == 'help':
-                usage('info')
-            else:
-                info(user_config, sys.argv[2])
-        elif sys.argv[1] == 'config':
-            if sys.argv[2] == 'help':
-                usage('config')
-            if sys.argv[2] == 'info':
-                user_config_info(user_config)
-            else:
-                set_user_config(sys.argv[2])
-        elif sys.argv[1] == 'getacl':
-            get_acl(user_config, sys.argv[2])
-        elif sys.argv[1] == 'setacl' and sys.argv[2] == 'help':
-            usage('setacl')
-        elif (sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[2] == 'get') or (sys.argv[2] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[1] == 'get'):
-            usage('getacl')
-        elif (sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[2] == 'set') or (sys.argv[2] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[1] == 'set'):
-            usage('setacl')
-        elif sys.argv[1] == 'getacl':
-            get_acl(user_config, sys.argv[2])
-        else:
-            usage()
-    elif len(sys.argv) == 4:
-        if (sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[2] == 'get') or (sys.argv[2] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[1] == 'get'):
-            get_acl(user_config, sys.argv[3])
-        elif sys.argv[1] == 'setacl':
-            set_acl(user_config, sys.argv[2], sys.argv[3])
-        elif sys.argv[1] == 'sshkey' and (sys.argv[2] == 'add' or sys.argv[2] == 'upload'):
-            sshkey_upload(user_config, sys.argv[3])
-        elif sys.argv[1] == 'sshkey' and (sys.argv[2] == 'rm' or sys.argv[2] == 'remove' or sys.argv[2] == 'delete'):
-            sshkey_remove(user_config, sys.argv[3])
-        else:
-            usage()
-    elif len(sys.argv) == 5:
-        if (sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[2] == 'set') or (sys.argv[2] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[1] == 'set'):
-            set_acl(user_config, sys.argv[3], sys.argv[4])
-        elif sys.argv[1] == 'setacl':
-            set_acl(user_config, sys.argv[2], sys.argv[3], sys.argv[4])
-        else:
-            usage()
-    elif len(sys.argv) == 6:
-        if (sys.argv[1] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[2] == 'set') or (sys.argv[2] in ('acl', 'ACL', 'acls', 'ACLs', 'rights') and sys.argv[1] == 'set'):
-            set_acl(user_config, sys.argv[3], sys.argv[4], sys.argv[5])
-        else:
-            usage()
-    else:
-        usage()
+        return
+    command, args = find_command(argv[1:])
+    if command is None:
+        return usage()
+    handler, needs_config, page, minimum, maximum = COMMANDS[command]
+    if args == ['help'] or not minimum <= len(args) <= maximum:
+        return usage(page)
+    if agent is None and tracer is None and command in AGENT_COMMANDS:
+        code = agent_forward(forwarded)
+        if code is not None:
+            sys.exit(code)
+    handler(get_user_config() if needs_config else None, args, options)
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+
+def refresh(tables):
+    marker = tables['path'] + '.refresh'
+    try:
+        if time.time() - os.stat(marker).st_mtime < tables['delay']:
+            return
+    except OSError:
+        pass
+    try:
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, 'w').close()
+        if os.fork() == 0:
+            try:
+                os.setsid()
+                null = os.open(os.devnull, os.O_RDWR)
+                for fd in (0, 1, 2):
+                    os.dup2(null, fd)
+                os.execv(tables['refresh'][0], tables['refresh'])
+            finally:
+                os._exit(1)
+    except (OSError, AttributeError):
+        pass
+
+def names(tables, kind, current):
+    import bisect
+    import marshal
+    try:
+        with open(tables['path'], 'rb') as file:
+            age = time.time() - os.fstat(file.fileno()).st_mtime
+            store = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        age, store = None, {}
+    if age is None or age > tables['max_age']:
+        refresh(tables)
+    names = store.get(kind, [])
+    index = bisect.bisect_left(names, current)
+    while index < len(names) and names[index].startswith(current):
+        yield names[index]
+        index += 1
+
+def kinds(tables, words, current):
+    top, subcommands, arguments = tables['commands']
+    aliases, subaliases, acl_aliases = tables['aliases']
+    flags, values = tables['options']
+    positional, option = [], None
+    for word in words:
+        if option is not None:
+            option = None
+        elif word in values:
+            option = word
+        elif not word.startswith('-'):
+            positional.append(word)
+    if option is not None:
+        return [values[option]]
+    if current.startswith('-'):
+        return [flags]
+    if len(positional) > 1 and positional[0] in ('get', 'set') and positional[1] in acl_aliases:
+        positional[0:2] = ['acl', positional[0]]
+    if positional:
+        positional[0:1] = aliases.get(positional[0], positional[:1])
+    if not positional:
+        return [top]
+    command, index = positional[0], len(positional) - 1
+    if index > 0:
+        subcommand = command + ' ' + subaliases.get(command, {}).get(positional[1], positional[1])
+        if subcommand in arguments:
+            command, index = subcommand, index - 1
+    expected, maximum = arguments.get(command, ((), 0))
+    if '--repos' in words and expected[:1] == ['repositories']:
+        expected, maximum = expected[1:], maximum - 1
+    found = [expected[min(index, len(expected) - 1)]] if expected and index < maximum else []
+    if index == 0 and command in subcommands:
+        found.append(subcommands[command])
+    return found
+
+def complete(tables, words, current):
+    status, candidates = 0, []
+    for kind in kinds(tables, words, current):
+        if kind == 'commands':
+            candidates.extend(word for word in tables['commands'][0] if word.startswith(current))
+        elif kind == 'files':
+            status = 1
+        elif kind == 'directories':
+            status = 2
+        elif isinstance(kind, str):
+            candidates.extend(names(tables, kind, current))
+        else:
+            candidates.extend(word for word in kind if word.startswith(current))
+    return (status, candidates)
+
+def main(tables, argv):
+    status, candidates = complete(tables, argv[1:-1], argv[-1] if len(argv) > 1 else '')
+    sys.stdout.write(''.join(candidate + '\n' for candidate in candidates))
+    sys.exit(status)
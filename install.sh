@@ -1,7 +1,14 @@
 #!/usr/bin/env sh
 
 if [ "$(id -u)" != "0" ]; then
-    cp ./blihbetter.py ~/.local/bin/blihbetter && echo "Script copied in '~/.local/bin/blihbetter'"
+    BIN_DIR=~/.local/bin
+    LIB_DIR=~/.local/lib/blihbetter
 else
-    cp ./blihbetter.py /usr/bin/blihbetter && echo "Script copied in '/usr/bin/blihbetter'"
-fi
\ No newline at end of file
+    BIN_DIR=/usr/bin
+    LIB_DIR=/usr/lib/blihbetter
+fi
+
+mkdir -p "$BIN_DIR" "$LIB_DIR"
+cp ./blihbetter.py ./blihbetter_completion.py "$LIB_DIR/" && python3 -m py_compile "$LIB_DIR/blihbetter.py" "$LIB_DIR/blihbetter_completion.py"
+printf '#!/usr/bin/env python3\nimport sys\nsys.path.insert(0, "%s")\nfrom blihbetter import main\nmain(sys.argv)\n' "$LIB_DIR" > "$BIN_DIR/blihbetter"
+chmod +x "$BIN_DIR/blihbetter" && echo "Script copied in '$BIN_DIR/blihbetter'"
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blihbetter
+
+USER_CONFIG = {'user': 'test@epitech.eu', 'token': 'token', 'blih_url': 'https://blih.epitech.eu/'}
+
+class BlihCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.json')
+        self.cache = blihbetter.BlihCache(self.path, max_entries=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def age(self, resource, seconds):
+        entry = self.cache.load()[self.cache.key(USER_CONFIG, resource)]
+        entry['time'] -= seconds
+        entry['used'] -= seconds
+
+    def test_put_get(self):
+        self.cache.put(USER_CONFIG, '/repositories', {'repositories': {'a': {}}})
+        self.assertEqual(self.cache.get(USER_CONFIG, '/repositories'), {'repositories': {'a': {}}})
+
+    def test_ttl(self):
+        self.cache.put(USER_CONFIG, '/repositories', {})
+        self.cache.put(USER_CONFIG, '/repository/a', {})
+        self.age('/repositories', 61)
+        self.age('/repository/a', 61)
+        self.assertIsNone(self.cache.get(USER_CONFIG, '/repositories'))
+        self.assertEqual(self.cache.get(USER_CONFIG, '/repository/a'), {})
+
+    def test_uncached_resource(self):
+        self.cache.put(USER_CONFIG, '/whoami', {'message': 'test@epitech.eu'})
+        self.assertIsNone(self.cache.get(USER_CONFIG, '/whoami'))
+        self.assertEqual(self.cache.load(), {})
+
+    def test_accounts(self):
+        self.cache.put(USER_CONFIG, '/sshkeys', {'a': 'key'})
+        self.assertIsNone(self.cache.get(dict(USER_CONFIG, user='other@epitech.eu'), '/sshkeys'))
+
+    def test_lru(self):
+        for name in ('a', 'b', 'c'):
+            self.cache.put(USER_CONFIG, '/repository/' + name, {'name': name})
+            self.age('/repository/' + name, 10)
+        self.assertIsNotNone(self.cache.get(USER_CONFIG, '/repository/a'))
+        self.cache.put(USER_CONFIG, '/repository/d', {'name': 'd'})
+        self.assertEqual(len(self.cache.load()), 3)
+        self.assertIsNone(self.cache.get(USER_CONFIG, '/repository/b'))
+        for name in ('a', 'c', 'd'):
+            self.assertEqual(self.cache.get(USER_CONFIG, '/repository/' + name), {'name': name})
+
+    def test_invalidate(self):
+        self.cache.put(USER_CONFIG, '/repositories', {})
+        self.cache.put(USER_CONFIG, '/repository/a', {})
+        self.cache.invalidate(USER_CONFIG, blihbetter.cache_dependencies('/repository/a'))
+        self.assertIsNone(self.cache.get(USER_CONFIG, '/repositories'))
+        self.assertIsNone(self.cache.get(USER_CONFIG, '/repository/a'))
+
+    def test_save(self):
+        self.cache.put(USER_CONFIG, '/sshkeys', {'a': 'key'})
+        self.cache.save()
+        self.assertEqual(blihbetter.BlihCache(self.path).get(USER_CONFIG, '/sshkeys'), {'a': 'key'})
+
+    def test_read_only(self):
+        self.cache.put(USER_CONFIG, '/sshkeys', {'a': 'key'})
+        self.cache.save()
+        mtime = os.stat(self.path).st_mtime_ns
+        cache = blihbetter.BlihCache(self.path)
+        cache.get(USER_CONFIG, '/sshkeys')
+        cache.save()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+if __name__ == '__main__':
+    unittest.main()
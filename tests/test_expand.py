@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench'))
+
+import blihbetter
+from mock_blih import MockBlihServer, MockBlihState
+
+class ExpandRepositoriesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.server = MockBlihServer(state=MockBlihState(repositories=30)).start()
+        cls.user_config = cls.server.user_config()
+        blihbetter.metadata_cache = blihbetter.BlihCache(os.path.join(cls.directory, 'cache.json'))
+
+    @classmethod
+    def tearDownClass(cls):
+        if blihbetter.client is not None:
+            blihbetter.client.close()
+        blihbetter.client = None
+        blihbetter.metadata_cache = None
+        cls.server.stop()
+        shutil.rmtree(cls.directory)
+
+    def write(self, lines):
+        path = os.path.join(self.directory, 'repos.txt')
+        with open(path, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        return path
+
+    def fail_open(self, *args, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), self.assertRaises(SystemExit) as error:
+            blihbetter.expand_repositories(self.user_config, *args, **kwargs)
+        self.assertEqual(error.exception.code, 1)
+        self.assertIn('Can\'t open file', output.getvalue())
+
+    def test_glob(self):
+        self.assertEqual(blihbetter.expand_repositories(self.user_config, 'repo-0001?'), ['repo-%05d' % i for i in range(10, 20)])
+        self.assertEqual(blihbetter.expand_repositories(self.user_config, 'nothing-*'), [])
+
+    def test_file(self):
+        path = self.write(['# comment', 'repo-00001', '', 'repo-0000[1-3]', 'unknown'])
+        self.assertEqual(blihbetter.expand_repositories(self.user_config, path), ['repo-00001', 'repo-00002', 'repo-00003', 'unknown'])
+        self.assertEqual(blihbetter.expand_repositories(self.user_config, path, from_file=True), ['repo-00001', 'repo-00002', 'repo-00003', 'unknown'])
+
+    def test_missing_file(self):
+        self.fail_open(os.path.join(self.directory, 'missing.txt'))
+        self.fail_open('repos.txt')
+        self.fail_open(os.path.join(self.directory, 'missing[1].txt'), from_file=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blihbetter
+
+USER_CONFIG = {'user': 'test@epitech.eu', 'token': 'token', 'blih_url': 'https://blih.epitech.eu/'}
+
+class BlihQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.queue = blihbetter.BlihQueue(os.path.join(self.directory, 'queue.jsonl'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rewrite(self, change):
+        line, entry = self.queue.read()[0]
+        change(entry)
+        self.queue.rewrite([json.dumps(entry, sort_keys=True)])
+
+    def test_append(self):
+        self.queue.append(USER_CONFIG, 'set_acl', ('repo', 'ramassage-tek', 'r'))
+        [(line, entry)] = self.queue.read()
+        self.assertEqual(entry['args'], ['repo', 'ramassage-tek', 'r'])
+        self.assertTrue(self.queue.owned(USER_CONFIG, entry))
+        self.assertTrue(self.queue.valid(USER_CONFIG, entry))
+        self.assertEqual(self.queue.pending(USER_CONFIG), 1)
+
+    def test_tampered_arguments(self):
+        self.queue.append(USER_CONFIG, 'set_acl', ('repo', 'ramassage-tek', 'r'))
+        self.rewrite(lambda entry: entry.update(args=['repo', 'someone', 'rwa']))
+        self.assertFalse(self.queue.valid(USER_CONFIG, self.queue.read()[0][1]))
+        self.assertEqual(self.queue.pending(USER_CONFIG), 0)
+
+    def test_tampered_operation(self):
+        self.queue.append(USER_CONFIG, 'create_repository', ('repo', None))
+        self.rewrite(lambda entry: entry.update(operation='delete_repository', args=['repo']))
+        self.assertEqual(self.queue.pending(USER_CONFIG), 0)
+
+    def test_other_token(self):
+        self.queue.append(USER_CONFIG, 'delete_repository', ('repo',))
+        entry = self.queue.read()[0][1]
+        self.assertTrue(self.queue.owned(dict(USER_CONFIG, token='other'), entry))
+        self.assertFalse(self.queue.valid(dict(USER_CONFIG, token='other'), entry))
+
+    def test_other_account(self):
+        self.queue.append(USER_CONFIG, 'delete_repository', ('repo',))
+        self.assertEqual(self.queue.pending(dict(USER_CONFIG, user='other@epitech.eu')), 0)
+        self.assertEqual(self.queue.pending(dict(USER_CONFIG, blih_url='http://localhost/')), 0)
+
+    def test_invalid_lines(self):
+        self.queue.append(USER_CONFIG, 'delete_repository', ('repo',))
+        with open(self.queue.path, 'a') as file:
+            file.write('not json\n[1, 2]\n\n')
+        entries = self.queue.read()
+        self.assertEqual([entry is None for line, entry in entries], [False, True, True])
+        self.assertEqual(self.queue.pending(USER_CONFIG), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blihbetter
+
+def parse(chunks, member='repositories'):
+    stream = blihbetter.JsonObjectStream(member)
+    entries = []
+    for i, chunk in enumerate(chunks):
+        entries += stream.feed(chunk, i == len(chunks) - 1)
+    return (entries, stream.values)
+
+def split(data, cuts):
+    cuts = [0] + sorted(cuts) + [len(data)]
+    return [data[start:end] for start, end in zip(cuts, cuts[1:])]
+
+class JsonObjectStreamTest(unittest.TestCase):
+    def check(self, document, chunks):
+        entries, values = parse(chunks)
+        self.assertEqual(entries, list(document['repositories'].items()))
+        self.assertEqual({key: value for key, value in values.items() if key != 'repositories'}, {key: value for key, value in document.items() if key != 'repositories'})
+
+    def test_whole(self):
+        document = {'message': 'ok', 'repositories': {'a': {'uuid': '1'}, 'b': {'uuid': '2'}}}
+        self.check(document, [json.dumps(document).encode()])
+
+    def test_every_split(self):
+        document = {'message': 'Listing', 'repositories': {'a': {'uuid': '1', 'url': 'https://a}'}, 'b"c': {}, 'd': 12.5, 'e': [1, {'f': '}'}]}, 'count': 4}
+        data = json.dumps(document, indent=1).encode()
+        for cut in range(1, len(data)):
+            self.check(document, split(data, [cut]))
+
+    def test_numbers(self):
+        self.check({'repositories': {'a': 1234, 'b': -5e-3}}, [b'{"repositories": {"a": 12', b'34, "b": -5', b'e-3}}'])
+        self.check({'repositories': {'a': 12}, 'count': 34}, [b'{"repositories": {"a": 12}, "count": 3', b'4}'])
+
+    def test_whitespace(self):
+        self.check({'repositories': {'a': {}, 'b': {}}}, [b'{ "repositories" : { "a" : {} \n', b' , "b": {}\t}\r\n}  '])
+
+    def test_utf8(self):
+        document = {'repositories': {'é': {'description': '中文'}}}
+        data = json.dumps(document, ensure_ascii=False).encode()
+        for cut in range(1, len(data)):
+            self.check(document, split(data, [cut]))
+
+    def test_random(self):
+        generator = random.Random(42)
+        for case in range(300):
+            document = {'message': 'ok', 'repositories': {'r' + str(i): {'uuid': str(generator.random()), 'public': generator.choice([True, False, None]), 'acls': {'u}': 'rw'}} for i in range(generator.randint(0, 20))}}
+            data = json.dumps(document, separators=generator.choice([(',', ':'), (', ', ': ')])).encode()
+            self.check(document, split(data, generator.sample(range(1, len(data)), min(len(data) - 1, 6))))
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            parse([b'{"repositories": {"a": {}'])
+        with self.assertRaises(ValueError):
+            parse([b'{"repositories": {"a": 1'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse([b'["repositories"]'])
+        with self.assertRaises(ValueError):
+            parse([b'{"repositories": {"a" 1}}'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env sh
 
 if [ "$(id -u)" != "0" ]; then
-    rm ~/.local/bin/blihbetter && echo "Script '~/.local/bin/blihbetter' removed"
+    rm ~/.local/bin/blihbetter && rm -r ~/.local/lib/blihbetter && echo "Script '~/.local/bin/blihbetter' removed"
 else
-    rm /usr/bin/blihbetter && echo "Script '/usr/bin/blihbetter' removed"
+    rm /usr/bin/blihbetter && rm -r /usr/lib/blihbetter && echo "Script '/usr/bin/blihbetter' removed"
 fi
\ No newline at end of file